@@ -2,7 +2,9 @@
 Budgeteer Flask Application Factory
 """
 from flask import Flask
+import db
 from db import get_db
+from app.migrations import run_migrations
 
 
 def create_app(config=None):
@@ -13,6 +15,36 @@ def create_app(config=None):
     
     # Configuration
     app.secret_key = config.get('SECRET_KEY', 'dev') if config else 'dev'
+    if config:
+        app.config.update(config)
+    
+    # Opt-in profiling: SQL, template and connection timings per request,
+    # sent as Server-Timing headers and listed at /debug/requests. The
+    # slow-query log (SLOW_QUERY_MS) runs on the same timed connections.
+    factory = None
+    if app.config.get('PROFILING') or app.config.get('SLOW_QUERY_MS') is not None:
+        from app.utils import profiling
+        if app.config.get('PROFILING'):
+            profiling.init_app(app)
+        profiling.set_slow_query_threshold(app.config.get('SLOW_QUERY_MS'))
+        factory = profiling.ProfiledConnection
+    
+    # Connection pool: one pooled connection is leased per request
+    db.configure(
+        path=app.config.get('DB_PATH'),
+        pragmas=app.config.get('DB_PRAGMAS'),
+        pool_size=app.config.get('DB_POOL_SIZE'),
+        factory=factory,
+    )
+    
+    # Conditional GETs: a matching If-None-Match gets a 304 before any
+    # connection is leased
+    from app.utils.etags import check_not_modified, add_etag
+    app.before_request(check_not_modified)
+    app.after_request(add_etag)
+    
+    app.before_request(db.bind_connection)
+    app.teardown_request(db.release_connection)
     
     # Initialize database
     _init_database()
@@ -20,26 +52,46 @@ def create_app(config=None):
     # Register blueprints
     from app.routes.dashboard import dashboard_bp
     from app.routes.accounts import accounts_bp
+    from app.routes.api import api_bp
     from app.routes.budgets import budgets_bp
     from app.routes.categories import categories_bp
     from app.routes.category_groups import category_groups_bp
     from app.routes.net_worth import net_worth_bp
     from app.routes.recurring import recurring_bp
+    from app.routes.rules import rules_bp
     from app.routes.settings import settings_bp
     from app.routes.tags import tags_bp
     from app.routes.transactions import transactions_bp
     
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(accounts_bp, url_prefix='/accounts')
+    app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(budgets_bp, url_prefix='/budgets')
     app.register_blueprint(categories_bp, url_prefix='/categories')
     app.register_blueprint(category_groups_bp, url_prefix='/category-groups')
     app.register_blueprint(net_worth_bp, url_prefix='/net-worth')
     app.register_blueprint(recurring_bp, url_prefix='/recurring')
+    app.register_blueprint(rules_bp, url_prefix='/rules')
     app.register_blueprint(settings_bp, url_prefix='/settings')
     app.register_blueprint(tags_bp, url_prefix='/tags')
     app.register_blueprint(transactions_bp, url_prefix='/transactions')
     
+    if app.config.get('PROFILING'):
+        from app.routes.debug import debug_bp
+        app.register_blueprint(debug_bp, url_prefix='/debug')
+    
+    # CLI commands
+    from app.cli import register_commands
+    register_commands(app)
+    
+    # Post recurring transactions in a background thread instead of on page
+    # views. It starts with the first request served, so CLI commands don't
+    # spawn one.
+    if app.config.get('RECURRING_SCHEDULER', True):
+        from app.services.recurring_scheduler import scheduler
+        interval = app.config.get('RECURRING_INTERVAL_SECONDS', 300)
+        app.before_request(lambda: scheduler.start(interval))
+    
     return app
 
 
@@ -47,6 +99,7 @@ def _init_database():
     """Initialize database schema and seed data."""
     with get_db() as db:
         db.executescript(open("schema.sql").read())
+        run_migrations(db)
         db.execute("INSERT OR IGNORE INTO users(id, name) VALUES (1, 'You')")
         
         # Seed starter categories if DB is empty
@@ -0,0 +1,212 @@
+"""
+Budgeteer CLI - Maintenance commands registered on `flask`
+"""
+import os
+import tempfile
+import time
+from datetime import date
+
+import click
+
+from app import plan_check
+from app.repositories.account_repository import AccountRepository
+from app.repositories.category_repository import CategoryRepository
+from app.repositories.monthly_totals_repository import MonthlyTotalsRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.services.export_service import EXPORT_FORMATS, ExportService
+from app.services.import_service import (
+    CsvMapping, ImportService, DEFAULT_BATCH_SIZE, STATEMENT_FORMATS
+)
+from app.services.recurring_scheduler import scheduler
+from app.services.rule_service import RuleService
+from app.utils.query_plans import format_plan
+
+
+def _resolve_account(name: str) -> int:
+    """Find an account id by name (case-insensitive) or exit with an error."""
+    for a in AccountRepository.get_all():
+        if a["name"].lower() == name.lower():
+            return a["id"]
+    raise click.BadParameter(f"No account named {name!r}.", param_hint="--account")
+
+
+def _resolve_category(name: str) -> int:
+    """Find a category id by name (case-insensitive) or exit with an error."""
+    for c in CategoryRepository.get_all():
+        if c["name"].lower() == name.lower():
+            return c["id"]
+    raise click.BadParameter(f"No category named {name!r}.", param_hint="--category")
+
+
+def _echo_progress(result) -> None:
+    click.echo(
+        f"  {result.rows_read:,} rows read, {result.inserted:,} imported "
+        f"({result.rows_per_second:,.0f} rows/s)",
+        err=True,
+    )
+
+
+def _duplicate_options(command):
+    command = click.option(
+        "--fuzzy-days", type=click.IntRange(0, 14), default=None,
+        help="Treat same account and amount within N days as a duplicate.",
+    )(command)
+    return click.option(
+        "--flag-duplicates", is_flag=True,
+        help="Import duplicates tagged 'Possible duplicate' instead of skipping them.",
+    )(command)
+
+
+def register_commands(app):
+    """Attach maintenance commands to the app's CLI group."""
+
+    @app.cli.command("rebuild-totals")
+    def rebuild_totals():
+        """Recompute the monthly_category_totals rollup from transactions."""
+        rows = MonthlyTotalsRepository.rebuild()
+        click.echo(f"Rebuilt monthly totals: {rows} month/category rows.")
+
+    @app.cli.command("rebuild-search")
+    def rebuild_search():
+        """Recompute the full-text search index from transactions."""
+        rows = TransactionRepository.rebuild_search_index()
+        click.echo(f"Rebuilt search index: {rows} transactions.")
+
+    @app.cli.command("apply-rules")
+    @click.option("--all", "all_rows", is_flag=True,
+                  help="Also re-categorize transactions that have a category.")
+    def apply_rules(all_rows):
+        """Run the categorization rules over existing transactions."""
+        started = time.perf_counter()
+        updated = RuleService.reapply(only_uncategorized=not all_rows)
+        click.echo(f"Categorized {updated} transaction(s) in {time.perf_counter() - started:.2f}s.")
+
+    @app.cli.command("post-recurring")
+    @click.option("--date", "on_date", default=None, metavar="YYYY-MM-DD",
+                  help="Post as of this date instead of today.")
+    def post_recurring(on_date):
+        """Post due recurring transactions (suitable for cron)."""
+        today = date.fromisoformat(on_date) if on_date else None
+        posted = scheduler.run_now(today)
+        click.echo(f"Posted {posted} recurring transaction(s).")
+
+    @app.cli.command("import-csv")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--account", required=True, help="Default account name.")
+    @click.option("--date-col", default="date", show_default=True)
+    @click.option("--amount-col", default="amount", show_default=True)
+    @click.option("--description-col", default="description", show_default=True)
+    @click.option("--category-col", default=None, help="Column holding category names.")
+    @click.option("--account-col", default=None, help="Column holding account names.")
+    @click.option("--date-format", default="%Y-%m-%d", show_default=True)
+    @click.option("--invert-sign", is_flag=True, help="Expenses are positive in the file.")
+    @click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True, type=int)
+    @_duplicate_options
+    def import_csv(path, account, date_col, amount_col, description_col, category_col,
+                   account_col, date_format, invert_sign, batch_size, flag_duplicates,
+                   fuzzy_days):
+        """Stream a CSV bank statement into transactions."""
+        mapping = CsvMapping(
+            date=date_col,
+            amount=amount_col,
+            description=description_col,
+            category=category_col,
+            account=account_col,
+            date_format=date_format,
+            invert_sign=invert_sign,
+        )
+        # Bank exports are often cp1252/Latin-1; replace undecodable bytes
+        with open(path, encoding="utf-8-sig", errors="replace", newline="") as stream:
+            result = ImportService.import_csv(
+                stream, mapping, _resolve_account(account),
+                batch_size=batch_size, progress=_echo_progress,
+                on_duplicate="flag" if flag_duplicates else "skip", fuzzy_days=fuzzy_days,
+            )
+        for err in result.errors:
+            click.echo(err, err=True)
+        click.echo(f"Import finished: {result.summary()}.")
+
+    @app.cli.command("import-statement")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--account", required=True, help="Default account name.")
+    @click.option("--day-first", is_flag=True, help="QIF dates are DD/MM/YY.")
+    @click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True, type=int)
+    @_duplicate_options
+    def import_statement(path, account, day_first, batch_size, flag_duplicates, fuzzy_days):
+        """Stream an OFX/QFX or QIF bank statement into transactions."""
+        fmt = STATEMENT_FORMATS.get(os.path.splitext(path)[1].lower())
+        if fmt not in ("ofx", "qif"):
+            raise click.BadParameter("Expected a .ofx, .qfx or .qif file.", param_hint="PATH")
+        # OFX 1.x files are often cp1252; replace undecodable bytes
+        with open(path, encoding="utf-8-sig", errors="replace", newline="") as stream:
+            result = ImportService.import_file(
+                stream, fmt, _resolve_account(account), day_first=day_first,
+                batch_size=batch_size, progress=_echo_progress,
+                on_duplicate="flag" if flag_duplicates else "skip", fuzzy_days=fuzzy_days,
+            )
+        for err in result.errors:
+            click.echo(err, err=True)
+        click.echo(f"Import finished: {result.summary()}.")
+
+    @app.cli.command("export-transactions")
+    @click.option("--format", "fmt", type=click.Choice(sorted(EXPORT_FORMATS)), default="csv",
+                  show_default=True)
+    @click.option("--gzip", "compress", is_flag=True, help="Gzip the output.")
+    @click.option("--from", "date_from", default=None, metavar="YYYY-MM-DD")
+    @click.option("--to", "date_to", default=None, metavar="YYYY-MM-DD")
+    @click.option("--account", default=None, help="Only this account (by name).")
+    @click.option("--category", default=None, help="Only this category (by name).")
+    @click.option("-o", "--output", type=click.File("wb"), default="-",
+                  help="Output file (default: stdout).")
+    def export_transactions(fmt, compress, date_from, date_to, account, category, output):
+        """Stream transactions as CSV or JSON Lines."""
+        filters = {
+            "date_from": date_from,
+            "date_to": date_to,
+            "account_id": _resolve_account(account) if account else None,
+            "category_id": _resolve_category(category) if category else None,
+        }
+        for chunk in ExportService.stream(filters, fmt, compress):
+            output.write(chunk)
+
+    @app.cli.command("check-query-plans")
+    @click.option("--transactions", type=click.IntRange(1000), default=plan_check.DEFAULT_TRANSACTIONS,
+                  show_default=True, help="Size of the synthetic database.")
+    @click.option("--database", "path", type=click.Path(dir_okay=False), default=None,
+                  help="Build the synthetic database here and keep it; reused if it exists.")
+    @click.option("-v", "--verbose", is_flag=True, help="Print every statement's plan.")
+    def check_query_plans(transactions, path, verbose):
+        """Fail if a repository query full-scans a large table."""
+        with tempfile.TemporaryDirectory() as tmp:
+            if path is None:
+                path = os.path.join(tmp, "plans.db")
+            if not os.path.exists(path):
+                click.echo(f"Building synthetic database ({transactions:,} transactions)...", err=True)
+                plan_check.build_database(path, transactions)
+            result = plan_check.run_check(path)
+
+        failing = {id(s) for s in result.failures}
+        for statement in result.statements:
+            failed = id(statement) in failing
+            if not (failed or verbose):
+                continue
+            click.echo(f"{'FAIL' if failed else 'ok  '} {statement.site or 'unknown call site'}"
+                       f" [{statement.case.label}]")
+            for table, detail in statement.unexpected_scans:
+                click.echo(f"     full scan of {table}: {detail}")
+            if statement.error:
+                click.echo(f"     {statement.error}")
+            if statement.site is None:
+                click.echo("     statement not attributed to a repository call site")
+            click.echo("     " + format_plan(statement.plan).replace("\n", "\n     "))
+        for site in result.uncovered:
+            click.echo(f"FAIL {site}: not run by the workload in app/plan_check.py")
+        for case, error in result.failed_cases:
+            click.echo(f"FAIL case {case.label!r} raised {error}")
+
+        click.echo(
+            f"{len(result.statements)} statements planned, {len(result.failures)} failing, "
+            f"{len(result.uncovered)} call site(s) uncovered, {len(result.failed_cases)} case(s) errored."
+        )
+        if not result.ok:
+            raise SystemExit(1)
@@ -0,0 +1,187 @@
+"""
+Database Migrations - Incremental upgrades for existing databases
+
+schema.sql describes a fresh database. Each migration below brings an
+older database forward one step; PRAGMA user_version records how many
+have been applied so each runs exactly once. Migrations must also be
+safe on a fresh database created from schema.sql.
+"""
+import sqlite3
+from typing import Callable, List
+
+from app.repositories.monthly_totals_repository import MonthlyTotalsRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.utils.fingerprint import fingerprint, normalize_description
+
+
+def _has_column(db: sqlite3.Connection, table: str, column: str) -> bool:
+    """Check for a column, including generated columns."""
+    rows = db.execute(f"PRAGMA table_xinfo({table})").fetchall()
+    return any(r["name"] == column for r in rows)
+
+
+def _transactions_month(db: sqlite3.Connection) -> None:
+    """Add the generated month column and month-scoped covering indexes."""
+    if not _has_column(db, "transactions", "month"):
+        db.execute(
+            """
+            ALTER TABLE transactions
+            ADD COLUMN month TEXT GENERATED ALWAYS AS (substr(date, 1, 7)) VIRTUAL
+            """
+        )
+    db.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_txn_month_cat
+        ON transactions(month, category_id, amount_cents)
+        """
+    )
+
+
+def _monthly_category_totals(db: sqlite3.Connection) -> None:
+    """Backfill the rollup table (created with its triggers by schema.sql)."""
+    MonthlyTotalsRepository.rebuild()
+
+
+def _recurring_watermark(db: sqlite3.Connection) -> None:
+    """Add the posted_through watermark and make (recurring_id, date) unique."""
+    if not _has_column(db, "recurring", "posted_through"):
+        db.execute("ALTER TABLE recurring ADD COLUMN posted_through TEXT")
+    # Drop duplicate postings left by earlier racing requests, keeping the first
+    db.execute(
+        """
+        DELETE FROM transactions
+        WHERE recurring_id IS NOT NULL
+        AND id NOT IN (
+            SELECT MIN(id) FROM transactions
+            WHERE recurring_id IS NOT NULL
+            GROUP BY recurring_id, date
+        )
+        """
+    )
+    db.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_txn_recurring_date
+        ON transactions(recurring_id, date)
+        WHERE recurring_id IS NOT NULL
+        """
+    )
+
+
+def _recurring_schedules(db: sqlite3.Connection) -> None:
+    """
+    Add frequency/start_date and widen day_of_month to 1-31.
+
+    SQLite cannot alter a CHECK constraint, so the table is rebuilt with
+    foreign keys off; transactions.recurring_id keeps pointing at the same ids.
+    """
+    if _has_column(db, "recurring", "frequency"):
+        return
+    db.commit()
+    fk_enabled = db.execute("PRAGMA foreign_keys").fetchone()[0]
+    db.execute("PRAGMA foreign_keys = OFF")
+    try:
+        db.executescript(
+            """
+            BEGIN;
+            CREATE TABLE recurring_new (
+              id INTEGER PRIMARY KEY,
+              name TEXT NOT NULL,
+              account_id INTEGER NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
+              category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+              amount_cents INTEGER NOT NULL,
+              day_of_month INTEGER NOT NULL CHECK (day_of_month BETWEEN 1 AND 31),
+              direction TEXT NOT NULL DEFAULT 'out' CHECK (direction IN ('in','out')),
+              active INTEGER NOT NULL DEFAULT 1,
+              posted_through TEXT,
+              frequency TEXT NOT NULL DEFAULT 'monthly'
+                CHECK (frequency IN ('weekly','biweekly','monthly','month_end')),
+              start_date TEXT
+            );
+            INSERT INTO recurring_new(id, name, account_id, category_id, amount_cents,
+                                      day_of_month, direction, active, posted_through)
+            SELECT id, name, account_id, category_id, amount_cents,
+                   day_of_month, direction, active, posted_through
+            FROM recurring;
+            DROP TABLE recurring;
+            ALTER TABLE recurring_new RENAME TO recurring;
+            COMMIT;
+            """
+        )
+    except sqlite3.Error:
+        db.rollback()
+        raise
+    finally:
+        db.execute(f"PRAGMA foreign_keys = {'ON' if fk_enabled else 'OFF'}")
+
+
+def _transactions_listing_indexes(db: sqlite3.Connection) -> None:
+    """Indexes for newest-first keyset pages filtered by account or category."""
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_txn_account_date ON transactions(account_id, date)"
+    )
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_txn_cat_date ON transactions(category_id, date)"
+    )
+
+
+def _transactions_fingerprint(db: sqlite3.Connection) -> None:
+    """Add and backfill the duplicate-detection fingerprint, then index it."""
+    if not _has_column(db, "transactions", "fingerprint"):
+        db.execute("ALTER TABLE transactions ADD COLUMN fingerprint INTEGER")
+    seen = {}
+    updates = []
+    for r in db.execute(
+        """
+        SELECT id, account_id, date, amount_cents, description
+        FROM transactions
+        WHERE fingerprint IS NULL
+        ORDER BY id
+        """
+    ):
+        # Identical rows get increasing ordinals, oldest first
+        key = (r["account_id"], r["date"], r["amount_cents"],
+               normalize_description(r["description"]))
+        ordinal = seen.get(key, 0)
+        seen[key] = ordinal + 1
+        updates.append(
+            (fingerprint(r["account_id"], r["date"], r["amount_cents"], r["description"], ordinal),
+             r["id"])
+        )
+    db.executemany("UPDATE transactions SET fingerprint = ? WHERE id = ?", updates)
+    db.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_txn_fingerprint ON transactions(fingerprint)"
+    )
+
+
+def _transactions_search_index(db: sqlite3.Connection) -> None:
+    """Backfill the full-text index (created with its triggers by schema.sql)."""
+    TransactionRepository.rebuild_search_index()
+
+
+def _bulk_edit_triggers(db: sqlite3.Connection) -> None:
+    """Recreate the rollup and search triggers with their bulk-edit guard."""
+    for name in ("trg_txn_totals_delete", "trg_txn_totals_update", "trg_txn_fts_delete",
+                 "trg_txn_fts_update", "trg_txn_tags_fts_insert", "trg_txn_tags_fts_delete"):
+        db.execute(f"DROP TRIGGER IF EXISTS {name}")
+    db.executescript(open("schema.sql").read())
+
+
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _transactions_month,
+    _monthly_category_totals,
+    _recurring_watermark,
+    _recurring_schedules,
+    _transactions_listing_indexes,
+    _transactions_fingerprint,
+    _transactions_search_index,
+    _bulk_edit_triggers,
+]
+
+
+def run_migrations(db: sqlite3.Connection) -> int:
+    """Apply pending migrations and return the resulting schema version."""
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    for step, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        migration(db)
+        db.execute(f"PRAGMA user_version = {step}")
+    return len(MIGRATIONS)
@@ -0,0 +1,474 @@
+"""
+Query Plan Check - EXPLAIN every repository statement against a large database
+
+Builds a synthetic database, runs a workload that calls every repository
+method, and records the query plan of each statement as it executes,
+attributed to its call site in app/repositories. A check fails when a
+statement scans a large table (see query_plans.LARGE_TABLES) that its
+case does not expect to, or when a call site was never exercised, so new
+queries have to be added to the workload below.
+"""
+import ast
+import glob
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import db
+from app.migrations import run_migrations
+from app.utils import query_plans
+
+DEFAULT_TRANSACTIONS = 200_000
+REPOSITORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "repositories")
+_EXECUTE_METHODS = ("execute", "executemany", "executescript")
+
+
+@dataclass
+class Case:
+    """One workload step. allow lists large tables it is expected to scan."""
+    label: str
+    run: Callable[[], object]
+    allow: Tuple[str, ...] = ()
+
+
+@dataclass
+class CallSite:
+    """A db.execute* call in a repository module."""
+    path: str
+    line: int
+    end_line: int
+    function: str
+
+    def __str__(self) -> str:
+        return f"{os.path.relpath(self.path)}:{self.line} ({self.function})"
+
+
+@dataclass
+class Statement:
+    """A statement seen while running a case, with its plan."""
+    case: Case
+    site: Optional[CallSite]
+    sql: str
+    plan: List[query_plans.PlanRow] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def unexpected_scans(self) -> List[Tuple[str, str]]:
+        return [
+            (table, detail) for table, detail in query_plans.large_scans(self.plan, self.sql)
+            if table not in self.case.allow
+        ]
+
+
+class _Rollback(Exception):
+    """Raised to undo a case's writes once it has run."""
+
+
+# --- Call sites ------------------------------------------------------------
+
+def find_call_sites(directory: str = REPOSITORY_DIR) -> List[CallSite]:
+    """Every execute/executemany/executescript call in the repository modules."""
+    sites = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        _collect_sites(tree, path, [], sites)
+    return sites
+
+
+def _collect_sites(node: ast.AST, path: str, scope: List[str], sites: List[CallSite]) -> None:
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            _collect_sites(child, path, scope + [child.name], sites)
+            continue
+        if (isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute)
+                and child.func.attr in _EXECUTE_METHODS):
+            sites.append(CallSite(path, child.lineno, child.end_lineno, ".".join(scope)))
+        _collect_sites(child, path, scope, sites)
+
+
+# --- Capture ---------------------------------------------------------------
+
+class _Recorder:
+    """Collects Statements for the case being run."""
+
+    def __init__(self, sites: List[CallSite]):
+        self.sites = sites
+        self.case: Optional[Case] = None
+        self.statements: List[Statement] = []
+
+    def site_for(self, path: str, line: int) -> Optional[CallSite]:
+        for site in self.sites:
+            if site.path == path and site.line <= line <= site.end_line:
+                return site
+        return None
+
+    def record(self, conn: sqlite3.Connection, sql: str, params) -> None:
+        if self.case is None:
+            return
+        frame = sys._getframe(2)
+        while frame is not None and not frame.f_code.co_filename.startswith(REPOSITORY_DIR):
+            frame = frame.f_back
+        if frame is None:
+            return
+        statement = Statement(self.case, self.site_for(frame.f_code.co_filename, frame.f_lineno), sql)
+        if params is None:
+            statement.error = "no parameters to plan with (pass a list to executemany)"
+        elif query_plans.is_explainable(sql):
+            try:
+                statement.plan = query_plans.explain(conn, sql, params)
+            except sqlite3.Error as e:
+                statement.error = f"EXPLAIN failed: {e}"
+        self.statements.append(statement)
+
+
+_recorder: Optional[_Recorder] = None
+
+
+class _CaptureCursor(sqlite3.Cursor):
+    """Plans each statement just before it runs."""
+
+    def execute(self, sql, parameters=()):
+        if _recorder is not None:
+            _recorder.record(self.connection, sql, parameters)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if _recorder is not None:
+            first = None
+            if isinstance(seq_of_parameters, (list, tuple)) and seq_of_parameters:
+                first = seq_of_parameters[0]
+            _recorder.record(self.connection, sql, first)
+        return super().executemany(sql, seq_of_parameters)
+
+
+class _CaptureConnection(sqlite3.Connection):
+    def cursor(self, factory=_CaptureCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# --- Synthetic database ----------------------------------------------------
+
+@contextmanager
+def _pool_for(path: str, factory: type = sqlite3.Connection):
+    """Point the connection pool at path for the duration, then restore it."""
+    previous = db.get_pool()
+    db.configure(path=path, factory=factory)
+    try:
+        with db.get_db() as conn:
+            yield conn
+    finally:
+        db.configure(path=previous.path, pragmas=previous.pragmas,
+                     pool_size=previous.max_size, factory=previous.factory)
+
+
+def build_database(path: str, transactions: int = DEFAULT_TRANSACTIONS,
+                   years: int = 5) -> None:
+    """
+    Create the schema at path and fill it with deterministic data: a few
+    dozen accounts, categories, tags, rules and recurring items, `years` of
+    monthly budgets and daily balances, and `transactions` transactions
+    (a third of them tagged), inserted through the usual triggers.
+    """
+    days = years * 365
+    with _pool_for(path) as conn:
+        # Migrations run their backfills through the repositories, so the
+        # schema is created on a pooled connection
+        conn.executescript(open("schema.sql").read())
+        run_migrations(conn)
+        conn.executescript(
+            """
+            BEGIN;
+            INSERT OR IGNORE INTO users(id, name, salary_annual_cents) VALUES (1, 'You', 7200000);
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 8)
+            INSERT INTO accounts(name, type)
+            SELECT 'Account ' || i, CASE i % 3 WHEN 0 THEN 'credit' WHEN 1 THEN 'debit'
+                                               ELSE 'investment' END FROM n;
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 8)
+            INSERT INTO category_groups(name, sort_order, type)
+            SELECT 'Group ' || i, i, CASE WHEN i = 1 THEN 'income' ELSE 'expense' END FROM n;
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 60)
+            INSERT INTO categories(name, group_id)
+            SELECT 'Category ' || i, CASE WHEN i % 10 = 0 THEN NULL ELSE i % 8 + 1 END FROM n;
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 40)
+            INSERT INTO tags(name, color) SELECT 'tag' || i, '#64748b' FROM n;
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 30)
+            INSERT INTO recurring(name, account_id, category_id, amount_cents, day_of_month,
+                                  direction, frequency, start_date, posted_through)
+            SELECT 'Recurring ' || i, i % 8 + 1, i % 60 + 1, 1000 * i, i % 28 + 1,
+                   CASE WHEN i % 5 = 0 THEN 'in' ELSE 'out' END,
+                   CASE i % 3 WHEN 0 THEN 'weekly' ELSE 'monthly' END,
+                   date('now', '-1 year'), date('now', '-1 month')
+            FROM n;
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 50)
+            INSERT INTO category_rules(match_type, pattern, category_id, account_id, priority)
+            SELECT CASE i % 3 WHEN 0 THEN 'contains' WHEN 1 THEN 'prefix' ELSE 'regex' END,
+                   'merchant' || i, i % 60 + 1, CASE WHEN i % 4 = 0 THEN i % 8 + 1 END, i
+            FROM n;
+            INSERT INTO category_rule_tags(rule_id, tag_id)
+            SELECT id, id % 40 + 1 FROM category_rules WHERE id % 2 = 0;
+            COMMIT;
+            """
+        )
+        conn.execute("BEGIN")
+        conn.execute(
+            """
+            WITH RECURSIVE m(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM m WHERE i < ? * 12)
+            INSERT INTO budgets(month, category_id, amount_cents)
+            SELECT strftime('%Y-%m', 'now', 'start of month', '-' || m.i || ' months'),
+                   c.id, 10000 + c.id * 500
+            FROM m, categories c
+            """,
+            (years,),
+        )
+        conn.execute(
+            """
+            WITH RECURSIVE d(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM d WHERE i < ?)
+            INSERT INTO account_balances(account_id, as_of, balance_cents)
+            SELECT a.id, date('now', '-' || d.i || ' days'), 100000 + (d.i * 7919 + a.id * 104729) % 5000000
+            FROM d, accounts a
+            """,
+            (days,),
+        )
+        conn.execute(
+            """
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+            INSERT INTO transactions(account_id, date, description, amount_cents, category_id,
+                                     fingerprint)
+            SELECT i % 8 + 1,
+                   date('now', '-' || (i * 7 % ?) || ' days'),
+                   'Merchant ' || (i * 31 % 997) || ' purchase',
+                   CASE WHEN i % 20 = 0 THEN 250000 ELSE -((i * 2654435761) % 20000 + 100) END,
+                   CASE WHEN i % 25 = 0 THEN NULL ELSE i * 13 % 60 + 1 END,
+                   i
+            FROM n
+            """,
+            (transactions, days),
+        )
+        conn.execute(
+            """
+            INSERT INTO transaction_tags(transaction_id, tag_id)
+            SELECT id, id * 7 % 40 + 1 FROM transactions WHERE id % 3 = 0
+            """
+        )
+        conn.commit()
+
+
+# --- Workload --------------------------------------------------------------
+
+def workload() -> List[Case]:
+    """Calls covering every repository statement, with representative arguments."""
+    from app.repositories.account_repository import AccountRepository
+    from app.repositories.budget_repository import BudgetRepository
+    from app.repositories.category_repository import CategoryGroupRepository, CategoryRepository
+    from app.repositories.dashboard_repository import DashboardRepository
+    from app.repositories.monthly_totals_repository import MonthlyTotalsRepository
+    from app.repositories.net_worth_repository import HISTORY_STEPS, NetWorthRepository
+    from app.repositories.recurring_repository import RecurringRepository
+    from app.repositories.rule_repository import RuleRepository
+    from app.repositories.tag_repository import TagRepository
+    from app.repositories.transaction_repository import TransactionRepository as Txn
+    from app.repositories.user_repository import UserRepository
+
+    today = date.today()
+    this_month = today.strftime("%Y-%m")
+    year_ago = today.replace(year=today.year - 1)
+    with db.get_db() as conn:
+        sample = conn.execute(
+            "SELECT id, date, fingerprint FROM transactions ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+    recent = {"date_from": year_ago.isoformat(), "date_to": today.isoformat()}
+    some_ids = list(range(sample["id"] - 500, sample["id"]))
+    tagged = TagRepository.get_transaction_ids(3)[:500]
+
+    def bulk(*steps):
+        def run():
+            Txn.stage_bulk({"category_id": 7, **recent}, ids=some_ids)
+            Txn.get_staged_months()
+            Txn.unindex_staged()
+            for step in steps:
+                step()
+            Txn.index_staged()
+            Txn.clear_bulk()
+        return run
+
+    return [
+        # Accounts
+        Case("accounts", lambda: (AccountRepository.get_all(), AccountRepository.get_by_id(1),
+                                  AccountRepository.get_all_ordered_by_type())),
+        Case("account create/update", lambda: AccountRepository.update(
+            AccountRepository.create("New account", "debit"), "Renamed", "credit")),
+        Case("account delete", lambda: AccountRepository.delete(2)),
+        # Budgets
+        Case("budgets for month", lambda: (
+            BudgetRepository.get_budget_map(this_month),
+            BudgetRepository.get_category_breakdown(this_month),
+            BudgetRepository.get_previous_month_data(this_month),
+        )),
+        Case("budget writes", lambda: (BudgetRepository.upsert(this_month, 3, 12345),
+                                       BudgetRepository.clear_month(this_month))),
+        # Categories and groups
+        Case("categories", lambda: (
+            CategoryRepository.get_all(), CategoryRepository.get_all_with_groups(),
+            CategoryRepository.get_all_with_group_details(), CategoryRepository.get_by_id(5),
+            CategoryRepository.is_used_by_recurring(5),
+            CategoryGroupRepository.get_all(),
+            CategoryGroupRepository.get_group_breakdown(this_month),
+            CategoryGroupRepository.get_categories_with_groups(),
+        )),
+        Case("category writes", lambda: CategoryRepository.set_group(
+            CategoryRepository.create("New category"), 2)),
+        Case("category merge", lambda: (CategoryRepository.move_references(5, 6),
+                                        CategoryRepository.delete(5))),
+        Case("category group writes", lambda: CategoryGroupRepository.delete(
+            CategoryGroupRepository.create("New group", 9, "expense"))),
+        # Dashboard and rollup
+        Case("dashboard summary", lambda: DashboardRepository.get_month_summary(this_month)),
+        # Recomputes every month, so reading all transactions is the point
+        Case("rebuild totals", MonthlyTotalsRepository.rebuild, allow=("transactions",)),
+        Case("rebuild totals for months", lambda: MonthlyTotalsRepository.rebuild_months(
+            [this_month, year_ago.strftime("%Y-%m")])),
+        # Net worth
+        Case("net worth on a date", lambda: (
+            NetWorthRepository.get_balances_for_date(today.isoformat()),
+            NetWorthRepository.get_summary_for_date(today.isoformat()),
+        )),
+        # The history chart covers every snapshot ever taken
+        Case("net worth history", lambda: [NetWorthRepository.get_history(step)
+                                           for step in HISTORY_STEPS],
+             allow=("account_balances",)),
+        Case("balance upsert", lambda: NetWorthRepository.upsert_balance(1, today.isoformat(), 5000)),
+        # Recurring
+        Case("recurring", lambda: (
+            RecurringRepository.get_pending(today.isoformat()),
+            RecurringRepository.get_all_with_details(),
+        )),
+        Case("recurring writes", lambda: (
+            RecurringRepository.post_occurrences(
+                [(1, today.isoformat(), "Rent", -150000, 1, 1)]),
+            RecurringRepository.advance_watermarks([1, 2], today.isoformat()),
+            RecurringRepository.toggle_active(3),
+            RecurringRepository.toggle_active(3, resume_after=today.isoformat()),
+            RecurringRepository.delete(RecurringRepository.create(
+                "New recurring", 1, 2, 1000, 15, "out")),
+        )),
+        # Rules
+        Case("rules", lambda: (RuleRepository.get_all(), RuleRepository.get_version())),
+        Case("rule writes", lambda: (
+            RuleRepository.add_hits({1: 3, 2: 5}),
+            RuleRepository.delete(RuleRepository.create("contains", "coffee", 3, tag_ids=[1, 2])),
+        )),
+        # Re-applying rules to every transaction walks the table in id order
+        Case("rule targets (all)", lambda: RuleRepository.get_targets(0, False, 1000),
+             allow=("transactions",)),
+        Case("rule targets (uncategorized)", lambda: RuleRepository.get_targets(0, True, 1000)),
+        # Tags
+        Case("tags", lambda: (TagRepository.get_all(), TagRepository.get_transaction_ids(5),
+                              TagRepository.get_monthly_spend(year_ago.strftime("%Y-%m")))),
+        Case("tag writes", lambda: (TagRepository.get_or_create("tag1", "#000000"),
+                                    TagRepository.delete(TagRepository.create("new", "#000000")))),
+        # Transactions
+        # Newest-first pages without an indexed filter walk the date index
+        # backwards and stop at the page size
+        Case("transaction page (newest first)", lambda: (
+            Txn.get_page({}),
+            Txn.get_page({"tag_id": 3}),
+            Txn.get_page({"exclude_ids": tagged}),
+        ), allow=("transactions",)),
+        Case("transaction page (indexed filters)", lambda: (
+            Txn.get_page({"account_id": 2}),
+            Txn.get_page({"category_id": 4}, before=(sample["date"], sample["id"])),
+            Txn.get_page(recent),
+            Txn.get_page({"ids": tagged}),
+        )),
+        Case("search", lambda: (
+            Txn.search("merchant 12", {}),
+            Txn.search("merchant", {"account_id": 1}, sort="relevance"),
+            Txn.search("merchant", recent, after=(sample["date"], sample["id"])),
+        )),
+        # An unfiltered export and a full reindex read every row by design
+        Case("export (all)", lambda: list(Txn.iter_export({})), allow=("transactions",)),
+        Case("export (filtered)", lambda: (list(Txn.iter_export(recent)),
+                                           list(Txn.iter_export({"account_id": 3})))),
+        Case("rebuild search index", Txn.rebuild_search_index, allow=("transactions",)),
+        Case("import", lambda: (
+            Txn.get_import_keys(year_ago.isoformat(), today.isoformat()),
+            Txn.insert_many([(1, today.isoformat(), "Imported", -500, 3, 10**12)]),
+            Txn.tag_by_fingerprints([10**12, sample["fingerprint"]], 4),
+            Txn.set_categories([(5, sample["id"]), (6, sample["id"] - 1)]),
+            Txn.attach_tags_many([(sample["id"], 5)]),
+        )),
+        Case("transaction writes", lambda: (
+            Txn.attach_tags(Txn.create(1, today.isoformat(), "Coffee", -450, 3), [1, 2]),
+            Txn.delete(sample["id"]),
+        )),
+        Case("month totals", lambda: (
+            Txn.get_trend_data(year_ago.strftime("%Y-%m"), this_month),
+            Txn.get_top_categories_in_range(year_ago.strftime("%Y-%m"), this_month),
+        )),
+        Case("bulk recategorize", bulk(lambda: Txn.bulk_set_category(9))),
+        Case("bulk tags", bulk(lambda: Txn.bulk_add_tags([1, 2]),
+                               lambda: Txn.bulk_remove_tags([1]))),
+        Case("bulk move", bulk(lambda: Txn.bulk_move_account(4))),
+        Case("bulk delete", bulk(Txn.bulk_delete)),
+        # Users
+        Case("user", lambda: (UserRepository.get_salary(), UserRepository.update_salary(8000000))),
+    ]
+
+
+# --- Check -----------------------------------------------------------------
+
+@dataclass
+class CheckResult:
+    statements: List[Statement]
+    uncovered: List[CallSite]
+    failed_cases: List[Tuple[Case, str]]
+
+    @property
+    def failures(self) -> List[Statement]:
+        return [s for s in self.statements if s.error or s.unexpected_scans or s.site is None]
+
+    @property
+    def ok(self) -> bool:
+        return not (self.failures or self.uncovered or self.failed_cases)
+
+
+def run_check(path: str, cases: Optional[Sequence[Case]] = None) -> CheckResult:
+    """
+    Run the workload against the database at path, each case in its own
+    rolled-back transaction, planning every statement it executes.
+    """
+    global _recorder
+    recorder = _Recorder(find_call_sites())
+    failed_cases = []
+    with _pool_for(path, _CaptureConnection):
+        _recorder = recorder
+        try:
+            for case in cases if cases is not None else workload():
+                recorder.case = case
+                try:
+                    with db.uow():
+                        case.run()
+                        raise _Rollback()
+                except _Rollback:
+                    pass
+                except Exception as e:
+                    failed_cases.append((case, f"{type(e).__name__}: {e}"))
+                finally:
+                    recorder.case = None
+        finally:
+            _recorder = None
+
+    covered = {id(s.site) for s in recorder.statements if s.site is not None}
+    uncovered = [site for site in recorder.sites if id(site) not in covered]
+    return CheckResult(recorder.statements, uncovered, failed_cases)
@@ -8,27 +8,6 @@ from db import get_db
 class BudgetRepository:
     """Handles all database operations for budgets."""
     
-    @staticmethod
-    def get_for_month(month_key: str) -> List[dict]:
-        """Get all budgets for a specific month."""
-        with get_db() as db:
-            return db.execute(
-                """
-                SELECT c.name, b.amount_cents
-                FROM budgets b 
-                JOIN categories c ON c.id=b.category_id
-                WHERE b.month=? 
-                ORDER BY c.name
-                """,
-                (month_key,),
-            ).fetchall()
-    
-    @staticmethod
-    def get_total_for_month(month_key: str) -> int:
-        """Get total budget amount for a month."""
-        rows = BudgetRepository.get_for_month(month_key)
-        return sum(r["amount_cents"] for r in rows)
-    
     @staticmethod
     def get_budget_map(month_key: str) -> Dict[int, int]:
         """Get a map of category_id -> budget amount for a month."""
@@ -68,26 +47,16 @@ class BudgetRepository:
                 SELECT
                     c.name,
                     COALESCE(b.amount_cents, 0) AS budget,
-                    COALESCE(
-                        ABS(
-                            SUM(
-                                CASE
-                                    WHEN t.amount_cents < 0 THEN t.amount_cents
-                                    ELSE 0
-                                END
-                            )
-                        ),
-                        0
-                    ) AS spent
+                    COALESCE(SUM(m.spent_cents), 0) AS spent
                 FROM categories c
                 LEFT JOIN category_groups g
                     ON g.id = c.group_id
                 LEFT JOIN budgets b
                     ON b.category_id = c.id
                 AND b.month = ?
-                LEFT JOIN transactions t
-                    ON t.category_id = c.id
-                AND substr(t.date, 1, 7) = ?
+                LEFT JOIN monthly_category_totals m
+                    ON m.category_id = c.id
+                AND m.month = ?
                 WHERE COALESCE(g.type, 'expense') = 'expense'
                 GROUP BY c.id, c.name
                 ORDER BY c.name
@@ -104,21 +73,11 @@ class BudgetRepository:
                 SELECT
                     b.category_id,
                     b.amount_cents AS budget_cents,
-                    COALESCE(
-                        ABS(
-                            SUM(
-                                CASE
-                                    WHEN t.amount_cents < 0 THEN t.amount_cents
-                                    ELSE 0
-                                END
-                            )
-                        ),
-                        0
-                    ) AS spent_cents
+                    COALESCE(SUM(m.spent_cents), 0) AS spent_cents
                 FROM budgets b
-                LEFT JOIN transactions t
-                    ON t.category_id = b.category_id
-                AND substr(t.date,1,7) = ?
+                LEFT JOIN monthly_category_totals m
+                    ON m.category_id = b.category_id
+                AND m.month = ?
                 WHERE b.month = ?
                 GROUP BY b.category_id
                 """,
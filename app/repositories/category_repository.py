@@ -48,6 +48,15 @@ class CategoryRepository:
                 """
             ).fetchall()
     
+    @staticmethod
+    def get_by_id(category_id: int) -> Optional[dict]:
+        """Get a single category by ID."""
+        with get_db() as db:
+            return db.execute(
+                "SELECT * FROM categories WHERE id = ?", 
+                (category_id,)
+            ).fetchone()
+    
     @staticmethod
     def create(name: str) -> int:
         """Create a new category and return its ID."""
@@ -64,6 +73,33 @@ class CategoryRepository:
         with get_db() as db:
             db.execute("DELETE FROM categories WHERE id = ?", (category_id,))
     
+    @staticmethod
+    def move_references(source_id: int, target_id: int) -> None:
+        """
+        Point budgets, recurring items and rules at target_id instead of
+        source_id. Budgets for a month both have are added together.
+        Transactions are left to the caller.
+        """
+        with get_db() as db:
+            db.execute(
+                """
+                INSERT INTO budgets(month, category_id, amount_cents)
+                SELECT month, ?, amount_cents FROM budgets WHERE category_id = ?
+                ON CONFLICT(month, category_id)
+                DO UPDATE SET amount_cents = amount_cents + excluded.amount_cents
+                """,
+                (target_id, source_id),
+            )
+            db.execute("DELETE FROM budgets WHERE category_id = ?", (source_id,))
+            db.execute(
+                "UPDATE recurring SET category_id = ? WHERE category_id = ?",
+                (target_id, source_id),
+            )
+            db.execute(
+                "UPDATE category_rules SET category_id = ? WHERE category_id = ?",
+                (target_id, source_id),
+            )
+    
     @staticmethod
     def is_used_by_recurring(category_id: int) -> bool:
         """Check if a category is used by any recurring items."""
@@ -144,12 +180,11 @@ class CategoryGroupRepository:
                 ),
                 cat_spent AS (
                     SELECT
-                        t.category_id,
-                        ABS(SUM(t.amount_cents)) AS spent
-                    FROM transactions t
-                    WHERE t.amount_cents < 0
-                    AND substr(t.date, 1, 7) = ?
-                    GROUP BY t.category_id
+                        m.category_id,
+                        m.spent_cents AS spent
+                    FROM monthly_category_totals m
+                    WHERE m.month = ?
+                    AND m.spent_cents > 0
                 )
 
                 SELECT
@@ -174,12 +209,12 @@ class CategoryGroupRepository:
                     NULL        AS sort_order,
                     1           AS sort_is_null,
                     0           AS budget,
-                    COALESCE(ABS(SUM(t.amount_cents)), 0) AS spent
-                FROM transactions t
-                LEFT JOIN categories c ON c.id = t.category_id
-                WHERE t.amount_cents < 0
-                AND substr(t.date, 1, 7) = ?
-                AND (c.group_id IS NULL OR t.category_id IS NULL)
+                    COALESCE(SUM(m.spent_cents), 0) AS spent
+                FROM monthly_category_totals m
+                LEFT JOIN categories c ON c.id = m.category_id
+                WHERE m.month = ?
+                AND m.spent_cents > 0
+                AND c.group_id IS NULL
 
                 ORDER BY sort_is_null, sort_order, group_name
                 """,
@@ -0,0 +1,58 @@
+"""
+Dashboard Repository - Consolidated database queries for the dashboard
+"""
+from dataclasses import dataclass
+from db import get_db
+
+
+@dataclass(frozen=True)
+class MonthSummary:
+    """Current-month headline figures, all in cents."""
+    salary_annual: int
+    income: int
+    spent: int
+    budget_total: int
+
+
+class DashboardRepository:
+    """Handles the dashboard's combined read queries."""
+
+    @staticmethod
+    def get_month_summary(month_key: str) -> MonthSummary:
+        """Get salary, income, spend and total budget for a month in one statement."""
+        with get_db() as db:
+            row = db.execute(
+                """
+                WITH
+                totals AS (
+                    SELECT
+                        COALESCE(SUM(income_cents), 0) AS income,
+                        COALESCE(SUM(spent_cents), 0)  AS spent
+                    FROM monthly_category_totals
+                    WHERE month = :month
+                ),
+                budget AS (
+                    SELECT COALESCE(SUM(amount_cents), 0) AS total
+                    FROM budgets
+                    WHERE month = :month
+                ),
+                salary AS (
+                    SELECT COALESCE(MAX(salary_annual_cents), 0) AS annual
+                    FROM users
+                    WHERE id = 1
+                )
+                SELECT
+                    salary.annual AS salary_annual,
+                    totals.income AS income,
+                    totals.spent  AS spent,
+                    budget.total  AS budget_total
+                FROM totals, budget, salary
+                """,
+                {"month": month_key},
+            ).fetchone()
+            return MonthSummary(
+                salary_annual=row["salary_annual"],
+                income=row["income"],
+                spent=row["spent"],
+                budget_total=row["budget_total"],
+            )
@@ -0,0 +1,61 @@
+"""
+Monthly Totals Repository - Database queries for the monthly_category_totals rollup
+"""
+import json
+from typing import List
+
+from db import get_db
+
+
+class MonthlyTotalsRepository:
+    """Handles maintenance of the trigger-maintained monthly category rollup."""
+
+    @staticmethod
+    def rebuild() -> int:
+        """Recompute the rollup from raw transactions and return its row count."""
+        with get_db() as db:
+            db.execute("DELETE FROM monthly_category_totals")
+            db.execute(
+                """
+                INSERT INTO monthly_category_totals(month, category_id, income_cents, spent_cents, txn_count)
+                SELECT
+                    month,
+                    COALESCE(category_id, 0),
+                    COALESCE(SUM(CASE WHEN amount_cents > 0 THEN amount_cents ELSE 0 END), 0),
+                    COALESCE(SUM(CASE WHEN amount_cents < 0 THEN -amount_cents ELSE 0 END), 0),
+                    COUNT(*)
+                FROM transactions
+                GROUP BY month, COALESCE(category_id, 0)
+                """
+            )
+            return db.execute(
+                "SELECT COUNT(*) AS c FROM monthly_category_totals"
+            ).fetchone()["c"]
+
+    @staticmethod
+    def rebuild_months(months: List[str]) -> None:
+        """Recompute the rollup rows of just these 'YYYY-MM' months."""
+        if not months:
+            return
+        months_json = json.dumps(months)
+        with get_db() as db:
+            db.execute(
+                "DELETE FROM monthly_category_totals WHERE month IN (SELECT value FROM json_each(?))",
+                (months_json,),
+            )
+            db.execute(
+                """
+                INSERT INTO monthly_category_totals(month, category_id, income_cents, spent_cents, txn_count)
+                SELECT
+                    month,
+                    COALESCE(category_id, 0),
+                    COALESCE(SUM(CASE WHEN amount_cents > 0 THEN amount_cents ELSE 0 END), 0),
+                    COALESCE(SUM(CASE WHEN amount_cents < 0 THEN -amount_cents ELSE 0 END), 0),
+                    COUNT(*)
+                FROM transactions
+                WHERE month IN (SELECT value FROM json_each(?))
+                GROUP BY month, COALESCE(category_id, 0)
+                """,
+                (months_json,),
+            )
+
@@ -5,6 +5,9 @@ from typing import List, Dict
 from db import get_db
 
 
+HISTORY_STEPS = ("snapshot", "day", "week", "month")
+
+
 class NetWorthRepository:
     """Handles all database operations for net worth tracking."""
     
@@ -29,8 +32,10 @@ class NetWorthRepository:
             rows = db.execute(
                 """
                 SELECT ab.account_id, ab.balance_cents
-                FROM account_balances ab
-                WHERE ab.as_of = ?
+                FROM accounts a
+                -- One (account_id, as_of) lookup per account instead of a scan
+                CROSS JOIN account_balances ab
+                    ON ab.account_id = a.id AND ab.as_of = ?
                 """,
                 (as_of,),
             ).fetchall()
@@ -38,7 +43,10 @@ class NetWorthRepository:
     
     @staticmethod
     def get_summary_for_date(as_of: str) -> dict:
-        """Get assets, liabilities, and net worth for a specific date."""
+        """
+        Get assets, liabilities, and net worth on a date, using each
+        account's latest balance on or before it.
+        """
         with get_db() as db:
             result = db.execute(
                 """
@@ -47,7 +55,11 @@ class NetWorthRepository:
                   COALESCE(SUM(CASE WHEN a.type = 'credit' THEN ab.balance_cents ELSE 0 END),0) AS liabilities
                 FROM accounts a
                 LEFT JOIN account_balances ab
-                  ON ab.account_id = a.id AND ab.as_of = ?
+                  ON ab.account_id = a.id
+                  AND ab.as_of = (
+                    SELECT MAX(as_of) FROM account_balances
+                    WHERE account_id = a.id AND as_of <= ?
+                  )
                 """,
                 (as_of,),
             ).fetchone()
@@ -62,18 +74,83 @@ class NetWorthRepository:
             }
     
     @staticmethod
-    def get_history() -> List[dict]:
-        """Get net worth history over time."""
+    def get_history(step: str = "snapshot") -> List[dict]:
+        """
+        Get net worth history, carrying each account's latest balance
+        forward to every point, so accounts snapshotted on different days
+        still add up.
+        
+        Each snapshot contributes its change from the account's previous
+        snapshot (LAG over the (account_id, as_of) index), and a running
+        SUM of those changes gives the totals at any date in one pass.
+        
+        Args:
+            step: "snapshot" for one point per snapshot date, or "day",
+                "week" (Sundays) or "month" (month ends) for a regular grid
+                from the first to the last snapshot
+        
+        Returns:
+            Rows of as_of, assets and liabilities in cents, oldest first
+        """
+        if step not in HISTORY_STEPS:
+            raise ValueError(f"Unknown history step: {step}")
         with get_db() as db:
             return db.execute(
                 """
-                SELECT
-                  ab.as_of AS as_of,
-                  COALESCE(SUM(CASE WHEN a.type IN ('debit','investment') THEN ab.balance_cents ELSE 0 END),0) AS assets,
-                  COALESCE(SUM(CASE WHEN a.type = 'credit' THEN ab.balance_cents ELSE 0 END),0) AS liabilities
-                FROM account_balances ab
-                JOIN accounts a ON a.id = ab.account_id
-                GROUP BY ab.as_of
-                ORDER BY ab.as_of
-                """
+                WITH RECURSIVE
+                bounds AS (
+                  SELECT MIN(as_of) AS first, MAX(as_of) AS last FROM account_balances
+                ),
+                grid(d) AS (
+                  SELECT CASE :step
+                    WHEN 'week' THEN date(first, 'weekday 0')
+                    WHEN 'month' THEN date(first, 'start of month', '+1 month', '-1 day')
+                    ELSE first
+                  END
+                  FROM bounds WHERE first IS NOT NULL AND :step != 'snapshot'
+                  UNION ALL
+                  SELECT CASE :step
+                    WHEN 'day' THEN date(d, '+1 day')
+                    WHEN 'week' THEN date(d, '+7 days')
+                    ELSE date(d, '+1 day', '+1 month', '-1 day')
+                  END
+                  FROM grid, bounds WHERE d < last
+                ),
+                changes AS (
+                  SELECT
+                    ab.as_of AS d,
+                    a.type,
+                    ab.balance_cents - COALESCE(
+                      LAG(ab.balance_cents) OVER (PARTITION BY ab.account_id ORDER BY ab.as_of), 0
+                    ) AS delta
+                  FROM account_balances ab
+                  JOIN accounts a ON a.id = ab.account_id
+                ),
+                points AS (
+                  SELECT
+                    d,
+                    1 AS is_snapshot,
+                    SUM(CASE WHEN type IN ('debit','investment') THEN delta ELSE 0 END) AS d_assets,
+                    SUM(CASE WHEN type = 'credit' THEN delta ELSE 0 END) AS d_liabilities
+                  FROM changes
+                  GROUP BY d
+                  UNION ALL
+                  SELECT d, 0, 0, 0 FROM grid
+                ),
+                running AS (
+                  SELECT
+                    d,
+                    is_snapshot,
+                    SUM(d_assets) OVER w AS assets,
+                    SUM(d_liabilities) OVER w AS liabilities
+                  FROM points
+                  -- a snapshot sorts before a grid point on the same day
+                  WINDOW w AS (ORDER BY d, is_snapshot DESC ROWS UNBOUNDED PRECEDING)
+                )
+                SELECT MIN(d, (SELECT last FROM bounds)) AS as_of, assets, liabilities
+                FROM running
+                WHERE is_snapshot = (:step = 'snapshot')
+                ORDER BY d
+                """,
+                {"step": step},
             ).fetchall()
@@ -1,7 +1,8 @@
 """
 Recurring Repository - Database queries for recurring transactions
 """
-from typing import List
+from typing import List, Optional
+from app.repositories.transaction_repository import TransactionRepository
 from db import get_db
 
 
@@ -9,17 +10,50 @@ class RecurringRepository:
     """Handles all database operations for recurring transactions."""
     
     @staticmethod
-    def get_all_active() -> List[dict]:
-        """Get all active recurring items."""
+    def get_pending(today: str) -> List[dict]:
+        """Get active items whose posted_through watermark is behind today."""
         with get_db() as db:
             return db.execute(
                 """
-                SELECT id, name, account_id, category_id, amount_cents, day_of_month, direction
+                SELECT id, name, account_id, category_id, amount_cents, day_of_month,
+                       direction, frequency, start_date, posted_through
                 FROM recurring
                 WHERE active = 1
-                """
+                AND (posted_through IS NULL OR posted_through < ?)
+                """,
+                (today,),
             ).fetchall()
     
+    @staticmethod
+    def post_occurrences(rows: List[tuple]) -> int:
+        """
+        Insert (account_id, date, description, amount_cents, category_id, recurring_id)
+        rows in one batch, skipping any already posted. Returns the number inserted.
+        """
+        with get_db() as db:
+            fingerprints = TransactionRepository.free_fingerprints(db, rows)
+            cursor = db.executemany(
+                """
+                INSERT OR IGNORE INTO transactions(account_id, date, description, amount_cents, category_id,
+                                                   recurring_id, fingerprint)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [row + (fp,) for row, fp in zip(rows, fingerprints)],
+            )
+            return cursor.rowcount
+    
+    @staticmethod
+    def advance_watermarks(recurring_ids: List[int], through: str) -> None:
+        """Mark occurrences up to and including `through` as posted."""
+        with get_db() as db:
+            db.executemany(
+                """
+                UPDATE recurring SET posted_through = ?
+                WHERE id = ? AND (posted_through IS NULL OR posted_through < ?)
+                """,
+                [(through, rid, through) for rid in recurring_ids],
+            )
+    
     @staticmethod
     def get_all_with_details() -> List[dict]:
         """Get all recurring items with account and category names."""
@@ -27,32 +61,41 @@ class RecurringRepository:
             return db.execute(
                 """
                 SELECT r.id, r.name, r.amount_cents, r.day_of_month, r.direction, r.active,
+                    r.frequency, r.start_date, r.posted_through,
                     a.name AS account_name,
                     c.name AS category_name
                 FROM recurring r
                 JOIN accounts a ON a.id = r.account_id
                 LEFT JOIN categories c ON c.id = r.category_id
-                ORDER BY r.day_of_month, r.name
+                ORDER BY r.frequency, r.day_of_month, r.name
                 """
             ).fetchall()
     
     @staticmethod
     def create(name: str, account_id: int, category_id: int, amount_cents: int,
-               day_of_month: int, direction: str, active: int = 1) -> int:
+               day_of_month: int, direction: str, active: int = 1,
+               frequency: str = "monthly", start_date: Optional[str] = None) -> int:
         """Create a new recurring item and return its ID."""
         with get_db() as db:
             cursor = db.execute(
                 """
-                INSERT INTO recurring (name, account_id, category_id, amount_cents, day_of_month, direction, active)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO recurring (name, account_id, category_id, amount_cents, day_of_month,
+                                       direction, active, frequency, start_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (name, account_id, category_id, amount_cents, day_of_month, direction, active)
+                (name, account_id, category_id, amount_cents, day_of_month,
+                 direction, active, frequency, start_date)
             )
             return cursor.lastrowid
     
     @staticmethod
-    def toggle_active(recurring_id: int) -> None:
-        """Toggle the active status of a recurring item."""
+    def toggle_active(recurring_id: int, resume_after: Optional[str] = None) -> None:
+        """
+        Toggle the active status of a recurring item.
+        
+        When re-enabling, the watermark is moved up to resume_after (if later)
+        so occurrences from the disabled period are not back-posted.
+        """
         with get_db() as db:
             row = db.execute(
                 "SELECT active FROM recurring WHERE id = ?",
@@ -64,6 +107,14 @@ class RecurringRepository:
                     "UPDATE recurring SET active = ? WHERE id = ?",
                     (new_active, recurring_id),
                 )
+                if new_active and resume_after:
+                    db.execute(
+                        """
+                        UPDATE recurring SET posted_through = ?
+                        WHERE id = ? AND (posted_through IS NULL OR posted_through < ?)
+                        """,
+                        (resume_after, recurring_id, resume_after),
+                    )
     
     @staticmethod
     def delete(recurring_id: int) -> None:
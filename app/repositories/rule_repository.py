@@ -0,0 +1,103 @@
+"""
+Rule Repository - Database queries for auto-categorization rules
+"""
+from typing import Dict, List, Optional
+from db import get_db
+
+
+class RuleRepository:
+    """Handles all database operations for category rules."""
+    
+    @staticmethod
+    def get_all() -> List[dict]:
+        """Get all rules in evaluation order, with category, account and tag names."""
+        with get_db() as db:
+            rows = db.execute(
+                """
+                SELECT
+                    r.id, r.match_type, r.pattern, r.min_cents, r.max_cents,
+                    r.account_id, r.category_id, r.priority, r.hit_count,
+                    c.name AS category, a.name AS account,
+                    (SELECT GROUP_CONCAT(rt.tag_id) FROM category_rule_tags rt
+                     WHERE rt.rule_id = r.id) AS tag_ids,
+                    (SELECT GROUP_CONCAT(tags.name, ', ') FROM category_rule_tags rt
+                     JOIN tags ON tags.id = rt.tag_id WHERE rt.rule_id = r.id) AS tags
+                FROM category_rules r
+                JOIN categories c ON c.id = r.category_id
+                LEFT JOIN accounts a ON a.id = r.account_id
+                ORDER BY r.priority, r.id
+                """
+            ).fetchall()
+            return [
+                dict(r, tag_ids=[int(t) for t in r["tag_ids"].split(",")] if r["tag_ids"] else [])
+                for r in rows
+            ]
+    
+    @staticmethod
+    def get_version() -> int:
+        """
+        Token that changes whenever rules or their tags are created, edited
+        or deleted, including by FK cascades (kept by triggers in schema.sql).
+        """
+        with get_db() as db:
+            row = db.execute("SELECT token FROM category_rules_version WHERE id = 1").fetchone()
+            return row["token"] if row else 0
+    
+    @staticmethod
+    def create(match_type: str, pattern: str, category_id: int,
+               min_cents: Optional[int] = None, max_cents: Optional[int] = None,
+               account_id: Optional[int] = None, priority: int = 100,
+               tag_ids: Optional[List[int]] = None) -> int:
+        """Create a rule and return its ID."""
+        with get_db() as db:
+            cursor = db.execute(
+                """
+                INSERT INTO category_rules
+                    (match_type, pattern, min_cents, max_cents, account_id, category_id, priority)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (match_type, pattern, min_cents, max_cents, account_id, category_id, priority),
+            )
+            rule_id = cursor.lastrowid
+            if tag_ids:
+                db.executemany(
+                    "INSERT OR IGNORE INTO category_rule_tags(rule_id, tag_id) VALUES (?, ?)",
+                    [(rule_id, t) for t in tag_ids],
+                )
+            return rule_id
+    
+    @staticmethod
+    def delete(rule_id: int) -> None:
+        """Delete a rule."""
+        with get_db() as db:
+            db.execute("DELETE FROM category_rules WHERE id = ?", (rule_id,))
+    
+    @staticmethod
+    def add_hits(hits: Dict[int, int]) -> None:
+        """Add to the hit counters of the given rules in one batch."""
+        if not hits:
+            return
+        with get_db() as db:
+            db.executemany(
+                "UPDATE category_rules SET hit_count = hit_count + ? WHERE id = ?",
+                [(count, rule_id) for rule_id, count in hits.items()],
+            )
+    
+    @staticmethod
+    def get_targets(after_id: int, only_uncategorized: bool, limit: int) -> List:
+        """
+        Next page of (id, description, amount_cents, account_id) of
+        transactions to re-apply rules to, in id order after after_id.
+        """
+        where = "AND category_id IS NULL" if only_uncategorized else ""
+        with get_db() as db:
+            return db.execute(
+                f"""
+                SELECT id, description, amount_cents, account_id
+                FROM transactions
+                WHERE id > ? {where}
+                ORDER BY id
+                LIMIT ?
+                """,
+                (after_id, limit),
+            ).fetchall()
@@ -26,6 +26,50 @@ class TagRepository:
             )
             return cursor.lastrowid
     
+    @staticmethod
+    def get_or_create(name: str, color: str) -> int:
+        """Return the ID of the tag with this name, creating it if needed."""
+        with get_db() as db:
+            db.execute(
+                "INSERT INTO tags(name, color) VALUES (?, ?) ON CONFLICT(name) DO NOTHING",
+                (name, color),
+            )
+            return db.execute("SELECT id FROM tags WHERE name = ?", (name,)).fetchone()[0]
+    
+    @staticmethod
+    def get_transaction_ids(tag_id: int) -> List[int]:
+        """Ids of the transactions carrying a tag, ascending, from the reverse index."""
+        with get_db() as db:
+            cursor = db.cursor()
+            cursor.row_factory = None  # plain tuples; this can be a million rows
+            cursor.execute(
+                "SELECT transaction_id FROM transaction_tags WHERE tag_id = ?", (tag_id,)
+            )
+            return [r[0] for r in cursor]
+    
+    @staticmethod
+    def get_monthly_spend(month_from: str) -> List[dict]:
+        """
+        Spending (positive cents) and transaction count per tag per month,
+        from month_from ('YYYY-MM') onwards.
+        """
+        with get_db() as db:
+            return db.execute(
+                """
+                SELECT
+                    tt.tag_id,
+                    t.month,
+                    SUM(CASE WHEN t.amount_cents < 0 THEN -t.amount_cents ELSE 0 END) AS spent_cents,
+                    COUNT(*) AS txn_count
+                FROM transactions t
+                -- Walk the date range, not every tag link in history
+                CROSS JOIN transaction_tags tt ON tt.transaction_id = t.id
+                WHERE t.date >= ?
+                GROUP BY tt.tag_id, t.month
+                """,
+                (month_from + "-01",),
+            ).fetchall()
+    
     @staticmethod
     def delete(tag_id: int) -> None:
         """Delete a tag."""
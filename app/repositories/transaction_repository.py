@@ -1,82 +1,549 @@
 """
 Transaction Repository - Database queries for transactions
 """
-from typing import List, Optional
+import json
+import re
+from datetime import date as date_cls, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from app.utils.fingerprint import first_free_fingerprint
 from db import get_db
 
 
+EPOCH = date_cls(1970, 1, 1)
+
+
 class TransactionRepository:
     """Handles all database operations for transactions."""
     
     @staticmethod
-    def get_recent(limit: int = 200) -> List[dict]:
-        """Get recent transactions with account, category, and tag info."""
+    def build_filter(filters: Dict) -> Tuple[str, list]:
+        """
+        Build a WHERE fragment (over alias t) and its parameters from filters:
+        date_from, date_to ('YYYY-MM-DD', inclusive), account_id, category_id,
+        tag_id, and ids / exclude_ids (id lists, e.g. from TagService.match()).
+        """
+        clauses, params = ["1 = 1"], []
+        if filters.get("date_from"):
+            clauses.append("t.date >= ?")
+            params.append(filters["date_from"])
+        if filters.get("date_to"):
+            clauses.append("t.date <= ?")
+            params.append(filters["date_to"])
+        if filters.get("account_id") is not None:
+            clauses.append("t.account_id = ?")
+            params.append(filters["account_id"])
+        if filters.get("category_id") is not None:
+            clauses.append("t.category_id = ?")
+            params.append(filters["category_id"])
+        if filters.get("tag_id") is not None:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM transaction_tags tt"
+                " WHERE tt.transaction_id = t.id AND tt.tag_id = ?)"
+            )
+            params.append(filters["tag_id"])
+        if filters.get("ids") is not None:
+            clauses.append("t.id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(filters["ids"]))
+        if filters.get("exclude_ids"):
+            clauses.append("t.id NOT IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(filters["exclude_ids"]))
+        return " AND ".join(clauses), params
+    
+    @staticmethod
+    def get_page(filters: Dict, before: Optional[Tuple[str, int]] = None,
+                 limit: int = 200) -> List[dict]:
+        """
+        Get one page of transactions, newest first, using keyset pagination.
+        
+        Args:
+            filters: See build_filter()
+            before: (date, id) of the last row on the previous page; rows
+                strictly older than it are returned
+            limit: Maximum number of rows
+        
+        Returns:
+            Rows with account, category and a 'name|color,...' tags string.
+            Tags are only looked up for the rows on this page.
+        """
+        where, params = TransactionRepository.build_filter(filters)
+        if before is not None:
+            where += " AND (t.date, t.id) < (?, ?)"
+            params.extend(before)
+        
         with get_db() as db:
-            return db.execute(
-                """
+            rows = db.execute(
+                f"""
                 SELECT
                     t.id, t.date, a.name AS account, t.description, t.amount_cents,
-                    c.name AS category,
-                    COALESCE(GROUP_CONCAT(tags.name || '|' || tags.color, ','), '') AS tags
-                FROM transactions t
+                    c.name AS category
+                FROM (
+                    -- Page over transactions alone so the date index drives the scan
+                    SELECT t.id, t.date, t.account_id, t.category_id, t.description, t.amount_cents
+                    FROM transactions t
+                    WHERE {where}
+                    ORDER BY t.date DESC, t.id DESC
+                    LIMIT ?
+                ) t
                 JOIN accounts a ON a.id=t.account_id
                 LEFT JOIN categories c ON c.id=t.category_id
-                LEFT JOIN transaction_tags tt ON tt.transaction_id = t.id
-                LEFT JOIN tags ON tags.id = tt.tag_id
-                GROUP BY t.id
-                ORDER BY date DESC, t.id DESC
+                ORDER BY t.date DESC, t.id DESC
+                """,
+                (*params, limit),
+            ).fetchall()
+            
+            tag_map = TransactionRepository._get_tag_strings(db, [r["id"] for r in rows])
+            return [dict(r, tags=tag_map.get(r["id"], "")) for r in rows]
+    
+    @staticmethod
+    def build_match_query(text: str) -> Optional[str]:
+        """
+        Turn free text into an FTS5 query: every word must match as a
+        prefix, e.g. 'amaz mar' -> '"amaz"* "mar"*'. None if no words.
+        """
+        words = re.findall(r"\w+", text or "")
+        if not words:
+            return None
+        return " ".join(f'"{w}"*' for w in words)
+    
+    @staticmethod
+    def _search_key(date: str, transaction_id: int = 0) -> int:
+        """transactions_fts rowid for a transaction: (days since 1970 << 32) | id."""
+        days = (date_cls.fromisoformat(date) - EPOCH).days
+        return (days << 32) | transaction_id
+    
+    @staticmethod
+    def search(text: str, filters: Dict, sort: str = "date",
+               after: Optional[tuple] = None, limit: int = 200) -> List[dict]:
+        """
+        Full-text search over description, category and tag names.
+        
+        Args:
+            text: Free text; each word is matched as a prefix
+            filters: See build_filter()
+            sort: "date" (newest first) or "relevance" (bm25, best first)
+            after: Keyset cursor from the previous page's last row:
+                (date, id) for date, (score, id) for relevance
+            limit: Maximum number of rows
+        
+        Returns:
+            Rows like get_page(), plus 'score' for relevance order.
+        
+        Date order walks the index backwards by rowid and stops after
+        `limit` hits, so it costs the same however many rows match.
+        Relevance order has to score every match first.
+        """
+        match = TransactionRepository.build_match_query(text)
+        if match is None:
+            return []
+        filters = dict(filters)
+        key_range, key_params = ["transactions_fts MATCH ?"], [match]
+        if sort == "date":
+            # Date bounds and the cursor become rowid bounds on the index;
+            # malformed dates fall back to the plain filter
+            bounds = [("date_from", "rowid >= ?", 0), ("date_to", "rowid < ?", 1)]
+            for name, clause, day_offset in bounds:
+                try:
+                    day = date_cls.fromisoformat(filters.get(name) or "")
+                except ValueError:
+                    continue
+                key_range.append(clause)
+                key_params.append(
+                    TransactionRepository._search_key((day + timedelta(days=day_offset)).isoformat())
+                )
+                del filters[name]
+            if after is not None:
+                try:
+                    key_params.append(TransactionRepository._search_key(*after))
+                    key_range.append("rowid < ?")
+                except ValueError:
+                    pass
+            score, order = "NULL", "m.key DESC"
+        else:
+            score, order = "bm25(transactions_fts, 4.0, 1.0, 1.0)", "m.score, t.id"
+        
+        where, params = TransactionRepository.build_filter(filters)
+        if sort != "date" and after is not None:
+            where += " AND (m.score, t.id) > (?, ?)"
+            params.extend(after)
+        
+        with get_db() as db:
+            rows = db.execute(
+                f"""
+                SELECT
+                    t.id, t.date, a.name AS account, t.description, t.amount_cents,
+                    c.name AS category, m.score
+                FROM (
+                    -- Description hits weigh more than category/tag hits
+                    SELECT rowid AS key, {score} AS score
+                    FROM transactions_fts
+                    WHERE {" AND ".join(key_range)}
+                ) m
+                JOIN transactions t ON t.id = (m.key & 4294967295)
+                JOIN accounts a ON a.id = t.account_id
+                LEFT JOIN categories c ON c.id = t.category_id
+                WHERE {where}
+                ORDER BY {order}
                 LIMIT ?
                 """,
-                (limit,)
+                (*key_params, *params, limit),
             ).fetchall()
+            
+            tag_map = TransactionRepository._get_tag_strings(db, [r["id"] for r in rows])
+            return [dict(r, tags=tag_map.get(r["id"], "")) for r in rows]
+    
+    @staticmethod
+    def rebuild_search_index() -> int:
+        """Repopulate transactions_fts from scratch; returns rows indexed."""
+        with get_db() as db:
+            db.execute("DELETE FROM transactions_fts")
+            cursor = db.execute(
+                """
+                INSERT INTO transactions_fts(rowid, description, category, tags)
+                SELECT
+                    (CAST(julianday(t.date) - 2440587.5 AS INTEGER) << 32) | t.id,
+                    t.description, c.name,
+                    COALESCE((SELECT GROUP_CONCAT(tags.name, ' ')
+                              FROM transaction_tags tt
+                              JOIN tags ON tags.id = tt.tag_id
+                              WHERE tt.transaction_id = t.id), '')
+                FROM transactions t
+                LEFT JOIN categories c ON c.id = t.category_id
+                """
+            )
+            db.execute("INSERT INTO transactions_fts(transactions_fts) VALUES ('optimize')")
+            return cursor.rowcount
+    
+    @staticmethod
+    def iter_export(filters: Dict, chunk_size: int = 2000) -> Iterator[List]:
+        """
+        Yield matching transactions oldest first, chunk_size rows at a time,
+        from one open cursor, with account, category and ';'-joined tag names.
+        Memory stays flat however many rows match.
+        """
+        where, params = TransactionRepository.build_filter(filters)
+        with get_db() as db:
+            cursor = db.execute(
+                f"""
+                SELECT
+                    t.id, t.date, a.name AS account, c.name AS category,
+                    t.description, t.amount_cents,
+                    (SELECT GROUP_CONCAT(tags.name, ';')
+                     FROM transaction_tags tt
+                     JOIN tags ON tags.id = tt.tag_id
+                     WHERE tt.transaction_id = t.id) AS tags
+                FROM transactions t
+                -- CROSS JOIN pins transactions as the outer loop, so a date
+                -- index supplies the order and rows stream without a sort
+                CROSS JOIN accounts a ON a.id = t.account_id
+                LEFT JOIN categories c ON c.id = t.category_id
+                WHERE {where}
+                ORDER BY t.date, t.id
+                """,
+                params,
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+    
+    @staticmethod
+    def _get_tag_strings(db, transaction_ids: List[int]) -> Dict[int, str]:
+        """Map transaction id -> 'name|color,...' for the given transactions."""
+        if not transaction_ids:
+            return {}
+        placeholders = ",".join("?" * len(transaction_ids))
+        rows = db.execute(
+            f"""
+            SELECT tt.transaction_id,
+                   GROUP_CONCAT(tags.name || '|' || tags.color, ',') AS tags
+            FROM transaction_tags tt
+            JOIN tags ON tags.id = tt.tag_id
+            WHERE tt.transaction_id IN ({placeholders})
+            GROUP BY tt.transaction_id
+            """,
+            transaction_ids,
+        ).fetchall()
+        return {r["transaction_id"]: r["tags"] for r in rows}
     
     @staticmethod
     def create(account_id: int, date: str, description: str, 
                amount_cents: int, category_id: int, recurring_id: Optional[int] = None) -> int:
         """Create a new transaction and return its ID."""
         with get_db() as db:
+            fp = TransactionRepository.free_fingerprints(
+                db, [(account_id, date, description, amount_cents)]
+            )[0]
             cursor = db.execute(
                 """
-                INSERT INTO transactions(account_id, date, description, amount_cents, category_id, recurring_id)
-                VALUES (?, ?, ?, ?, ?, ?)
+                INSERT INTO transactions(account_id, date, description, amount_cents, category_id,
+                                         recurring_id, fingerprint)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
                 """,
-                (account_id, date, description, amount_cents, category_id, recurring_id),
+                (account_id, date, description, amount_cents, category_id, recurring_id, fp),
             )
             return cursor.lastrowid
     
     @staticmethod
-    def delete(transaction_id: int) -> None:
-        """Delete a transaction."""
-        with get_db() as db:
-            db.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
+    def free_fingerprints(db, rows: Iterable[tuple]) -> List[int]:
+        """
+        Fingerprints for new (account_id, date, description, amount_cents, ...)
+        rows, using the first ordinal not already stored or used earlier in
+        the same batch.
+        """
+        reserved = set()
+
+        def taken(fp: int) -> bool:
+            if fp in reserved:
+                return True
+            return db.execute(
+                "SELECT 1 FROM transactions WHERE fingerprint = ?", (fp,)
+            ).fetchone() is not None
+
+        result = []
+        for account_id, date, description, amount_cents, *_ in rows:
+            fp = first_free_fingerprint(account_id, date, amount_cents, description, taken)
+            reserved.add(fp)
+            result.append(fp)
+        return result
     
     @staticmethod
-    def get_income_for_month(month_key: str) -> int:
-        """Get total income (positive transactions) for a given month."""
+    def get_import_keys(date_from: str, date_to: str) -> List[tuple]:
+        """
+        (fingerprint, account_id, amount_cents, date) for every transaction
+        in [date_from, date_to], used to screen imports for duplicates.
+        """
         with get_db() as db:
-            result = db.execute(
+            return db.execute(
                 """
-                SELECT COALESCE(SUM(CASE WHEN amount_cents > 0 THEN amount_cents ELSE 0 END), 0) AS income
+                SELECT fingerprint, account_id, amount_cents, date
                 FROM transactions
-                WHERE substr(date, 1, 7) = ?
-                """, 
-                (month_key,)
-            ).fetchone()
-            return result["income"] if result else 0
+                WHERE date BETWEEN ? AND ?
+                """,
+                (date_from, date_to),
+            ).fetchall()
     
     @staticmethod
-    def get_spending_for_month(month_key: str) -> int:
-        """Get total spending (negative transactions) for a given month."""
+    def insert_many(rows: List[tuple]) -> int:
+        """
+        Bulk insert (account_id, date, description, amount_cents, category_id,
+        fingerprint) rows with one executemany, skipping fingerprints that are
+        already stored. Returns the number inserted.
+        """
         with get_db() as db:
-            result = db.execute(
+            cursor = db.executemany(
                 """
-                SELECT COALESCE(ABS(SUM(CASE WHEN amount_cents<0 THEN amount_cents ELSE 0 END)),0) AS spent
-                FROM transactions
-                WHERE substr(date,1,7)=?
+                INSERT OR IGNORE INTO transactions(account_id, date, description, amount_cents,
+                                                   category_id, fingerprint)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            return cursor.rowcount
+    
+    @staticmethod
+    def set_categories(assignments: List[Tuple[int, int]]) -> int:
+        """
+        Apply many (category_id, transaction_id) assignments in one batch.
+        Rows already in that category are left alone so they don't fire the
+        totals and search-index triggers. Returns the number changed.
+        """
+        with get_db() as db:
+            cursor = db.executemany(
+                """
+                UPDATE transactions SET category_id = ?1
+                WHERE id = ?2 AND category_id IS NOT ?1
                 """,
-                (month_key,),
-            ).fetchone()
-            return result["spent"] if result else 0
+                assignments,
+            )
+            return cursor.rowcount
+    
+    @staticmethod
+    def attach_tags_many(pairs: List[Tuple[int, int]]) -> None:
+        """Attach many (transaction_id, tag_id) pairs in one batch."""
+        with get_db() as db:
+            db.executemany(
+                """
+                INSERT OR IGNORE INTO transaction_tags(transaction_id, tag_id)
+                VALUES (?, ?)
+                """,
+                pairs,
+            )
+    
+    @staticmethod
+    def tag_by_fingerprints(fingerprints: List[int], tag_id: int) -> None:
+        """Attach a tag to the transactions with the given fingerprints."""
+        with get_db() as db:
+            for i in range(0, len(fingerprints), 500):
+                chunk = fingerprints[i:i + 500]
+                db.execute(
+                    f"""
+                    INSERT OR IGNORE INTO transaction_tags(transaction_id, tag_id)
+                    SELECT id, ? FROM transactions
+                    WHERE fingerprint IN ({", ".join("?" * len(chunk))})
+                    """,
+                    [tag_id, *chunk],
+                )
+    
+    # Bulk edits. stage_bulk() fills bulk_edit_ids, which suspends the
+    # per-row rollup and search-index triggers; the bulk_* statements then
+    # work on every staged row at once, and the caller refreshes the
+    # derived data and calls clear_bulk() before its unit of work commits.
+    
+    @staticmethod
+    def stage_bulk(filters: Optional[Dict] = None, ids: Optional[List[int]] = None) -> int:
+        """Stage transactions matching filters (and ids, if given); returns the count."""
+        where, params = TransactionRepository.build_filter(filters or {})
+        if ids is not None:
+            where += " AND t.id IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(ids))
+        with get_db() as db:
+            db.execute("DELETE FROM bulk_edit_ids")
+            cursor = db.execute(
+                f"INSERT INTO bulk_edit_ids(id) SELECT t.id FROM transactions t WHERE {where}",
+                params,
+            )
+            return cursor.rowcount
+    
+    @staticmethod
+    def get_staged_months() -> List[str]:
+        """Distinct 'YYYY-MM' months of the staged transactions."""
+        with get_db() as db:
+            rows = db.execute(
+                """
+                SELECT DISTINCT t.month FROM bulk_edit_ids b
+                -- Staged ids drive the join; otherwise the planner walks an
+                -- index over every transaction to produce distinct months
+                CROSS JOIN transactions t ON t.id = b.id
+                """
+            ).fetchall()
+            return [r["month"] for r in rows]
+    
+    @staticmethod
+    def clear_bulk() -> None:
+        """Unstage everything, re-enabling the per-row triggers."""
+        with get_db() as db:
+            db.execute("DELETE FROM bulk_edit_ids")
+    
+    @staticmethod
+    def bulk_set_category(category_id: Optional[int]) -> int:
+        """Recategorize the staged transactions; returns rows changed."""
+        with get_db() as db:
+            cursor = db.execute(
+                """
+                UPDATE transactions SET category_id = ?1
+                WHERE id IN (SELECT id FROM bulk_edit_ids) AND category_id IS NOT ?1
+                """,
+                (category_id,),
+            )
+            return cursor.rowcount
+    
+    @staticmethod
+    def bulk_add_tags(tag_ids: List[int]) -> int:
+        """Attach tags to the staged transactions; returns links added."""
+        with get_db() as db:
+            cursor = db.execute(
+                """
+                INSERT OR IGNORE INTO transaction_tags(transaction_id, tag_id)
+                SELECT b.id, j.value FROM bulk_edit_ids b, json_each(?) j
+                """,
+                (json.dumps(tag_ids),),
+            )
+            return cursor.rowcount
+    
+    @staticmethod
+    def bulk_remove_tags(tag_ids: List[int]) -> int:
+        """Detach tags from the staged transactions; returns links removed."""
+        with get_db() as db:
+            cursor = db.execute(
+                """
+                DELETE FROM transaction_tags
+                WHERE transaction_id IN (SELECT id FROM bulk_edit_ids)
+                AND tag_id IN (SELECT value FROM json_each(?))
+                """,
+                (json.dumps(tag_ids),),
+            )
+            return cursor.rowcount
+    
+    @staticmethod
+    def bulk_move_account(account_id: int) -> int:
+        """
+        Move the staged transactions to another account. Their fingerprints
+        include the account, so they are recomputed; returns rows moved.
+        """
+        with get_db() as db:
+            cursor = db.execute(
+                """
+                UPDATE transactions SET account_id = ?1, fingerprint = NULL
+                WHERE id IN (SELECT id FROM bulk_edit_ids) AND account_id != ?1
+                """,
+                (account_id,),
+            )
+            moved = cursor.rowcount
+            rows = db.execute(
+                """
+                SELECT id, account_id, date, description, amount_cents
+                FROM transactions
+                WHERE id IN (SELECT id FROM bulk_edit_ids) AND fingerprint IS NULL
+                ORDER BY id
+                """
+            ).fetchall()
+            fps = TransactionRepository.free_fingerprints(
+                db, [(r["account_id"], r["date"], r["description"], r["amount_cents"]) for r in rows]
+            )
+            db.executemany(
+                "UPDATE transactions SET fingerprint = ? WHERE id = ?",
+                [(fp, r["id"]) for fp, r in zip(fps, rows)],
+            )
+            return moved
+    
+    @staticmethod
+    def bulk_delete() -> int:
+        """Delete the staged transactions; returns rows deleted."""
+        with get_db() as db:
+            cursor = db.execute(
+                "DELETE FROM transactions WHERE id IN (SELECT id FROM bulk_edit_ids)"
+            )
+            return cursor.rowcount
+    
+    @staticmethod
+    def unindex_staged() -> None:
+        """Remove the staged transactions from the search index."""
+        with get_db() as db:
+            db.execute(
+                """
+                DELETE FROM transactions_fts WHERE rowid IN (
+                    SELECT (CAST(julianday(t.date) - 2440587.5 AS INTEGER) << 32) | t.id
+                    FROM bulk_edit_ids b CROSS JOIN transactions t ON t.id = b.id
+                )
+                """
+            )
+    
+    @staticmethod
+    def index_staged() -> None:
+        """(Re)add the staged transactions that still exist to the search index."""
+        with get_db() as db:
+            db.execute(
+                """
+                INSERT INTO transactions_fts(rowid, description, category, tags)
+                SELECT
+                    (CAST(julianday(t.date) - 2440587.5 AS INTEGER) << 32) | t.id,
+                    t.description, c.name,
+                    COALESCE((SELECT GROUP_CONCAT(tags.name, ' ')
+                              FROM transaction_tags tt
+                              JOIN tags ON tags.id = tt.tag_id
+                              WHERE tt.transaction_id = t.id), '')
+                FROM bulk_edit_ids b
+                JOIN transactions t ON t.id = b.id
+                LEFT JOIN categories c ON c.id = t.category_id
+                """
+            )
+    
+    @staticmethod
+    def delete(transaction_id: int) -> None:
+        """Delete a transaction."""
+        with get_db() as db:
+            db.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
     
     @staticmethod
     def get_trend_data(start_month: str, end_month: str) -> List[dict]:
@@ -85,12 +552,12 @@ class TransactionRepository:
             return db.execute(
                 """
                 SELECT
-                    substr(date,1,7) AS mkey,
-                    COALESCE(SUM(CASE WHEN amount_cents > 0 THEN amount_cents ELSE 0 END),0) AS income,
-                    COALESCE(ABS(SUM(CASE WHEN amount_cents < 0 THEN amount_cents ELSE 0 END)),0) AS spent
-                FROM transactions
-                WHERE substr(date,1,7) BETWEEN ? AND ?
-                GROUP BY substr(date,1,7)
+                    month AS mkey,
+                    COALESCE(SUM(income_cents), 0) AS income,
+                    COALESCE(SUM(spent_cents), 0) AS spent
+                FROM monthly_category_totals
+                WHERE month BETWEEN ? AND ?
+                GROUP BY month
                 """,
                 (start_month, end_month),
             ).fetchall()
@@ -103,11 +570,11 @@ class TransactionRepository:
                 """
                 SELECT
                     COALESCE(c.name, 'Uncategorized') AS category,
-                    COALESCE(ABS(SUM(t.amount_cents)),0) AS spent
-                FROM transactions t
-                LEFT JOIN categories c ON c.id = t.category_id
-                WHERE t.amount_cents < 0
-                AND substr(t.date,1,7) BETWEEN ? AND ?
+                    COALESCE(SUM(m.spent_cents), 0) AS spent
+                FROM monthly_category_totals m
+                LEFT JOIN categories c ON c.id = m.category_id
+                WHERE m.spent_cents > 0
+                AND m.month BETWEEN ? AND ?
                 GROUP BY category
                 ORDER BY spent DESC
                 LIMIT ?
@@ -115,28 +582,14 @@ class TransactionRepository:
                 (start_month, end_month, limit),
             ).fetchall()
     
-    @staticmethod
-    def check_exists_for_recurring(recurring_id: int, date: str) -> bool:
-        """Check if a transaction already exists for a recurring item on a specific date."""
-        with get_db() as db:
-            result = db.execute(
-                """
-                SELECT 1 FROM transactions
-                WHERE recurring_id = ? AND date = ?
-                """,
-                (recurring_id, date),
-            ).fetchone()
-            return result is not None
-    
     @staticmethod
     def attach_tags(transaction_id: int, tag_ids: List[int]) -> None:
         """Attach tags to a transaction."""
         with get_db() as db:
-            for tag_id in tag_ids:
-                db.execute(
-                    """
-                    INSERT OR IGNORE INTO transaction_tags(transaction_id, tag_id)
-                    VALUES (?, ?)
-                    """,
-                    (transaction_id, tag_id),
-                )
+            db.executemany(
+                """
+                INSERT OR IGNORE INTO transaction_tags(transaction_id, tag_id)
+                VALUES (?, ?)
+                """,
+                [(transaction_id, tag_id) for tag_id in tag_ids],
+            )
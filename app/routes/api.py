@@ -0,0 +1,34 @@
+"""
+API Blueprint - JSON data for charts loaded by the pages
+"""
+from datetime import date
+from flask import Blueprint, abort, current_app, jsonify, request
+
+from app.services.dashboard_service import CHARTS, DashboardService
+from app.utils.downsample import DEFAULT_CHART_POINTS, clamp_points
+
+
+api_bp = Blueprint('api', __name__)
+
+
+@api_bp.route("/dashboard/<name>")
+def dashboard_chart(name):
+    """
+    One dashboard chart as columns: "labels" plus parallel lists of cents.
+    Charts are computed and cached independently of each other; ?points=
+    bounds the length of long series (CHART_MAX_POINTS by default).
+    """
+    if name not in CHARTS:
+        abort(404)
+    
+    range_key = request.args.get("range", "1")  # "1", "3", "6", "ytd"
+    max_points = clamp_points(
+        request.args.get("points"),
+        current_app.config.get("CHART_MAX_POINTS", DEFAULT_CHART_POINTS),
+    )
+    data = DashboardService.get_chart(name, date.today(), range_key, max_points)
+    
+    response = jsonify(data)
+    # Personal data: browsers may keep it but must check back before reuse
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -9,6 +9,7 @@ from app.repositories.category_repository import CategoryRepository
 from app.utils.date_helpers import prev_month_key
 from app.utils.validators import parse_float, dollars_to_cents
 from calculations import month_key
+from db import uow
 
 
 budgets_bp = Blueprint('budgets', __name__)
@@ -37,8 +38,10 @@ def index():
                 amt = parse_float(val, 0)
                 items.append((month, cat_id, dollars_to_cents(amt)))
         
-        for m, cid, cents in items:
-            BudgetRepository.upsert(m, cid, cents)
+        # One transaction for the whole form
+        with uow():
+            for m, cid, cents in items:
+                BudgetRepository.upsert(m, cid, cents)
         
         flash('Budgets saved.', 'success')
         return redirect(url_for('budgets.index', month=month))
@@ -5,6 +5,8 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 import sqlite3
 
 from app.repositories.category_repository import CategoryRepository
+from app.services.bulk_edit_service import BulkEditService
+from app.utils.validators import parse_int
 
 
 categories_bp = Blueprint('categories', __name__)
@@ -40,3 +42,19 @@ def delete(cat_id):
     CategoryRepository.delete(cat_id)
     flash("Category deleted.", "success")
     return redirect(url_for('categories.index'))
+
+
+@categories_bp.post('/<int:cat_id>/merge')
+def merge(cat_id):
+    """Merge a category into another, moving its transactions and budgets."""
+    target_id = parse_int(request.form.get('target_id'), None)
+    if target_id is None:
+        flash("Choose a category to merge into.", "error")
+        return redirect(url_for('categories.index'))
+    try:
+        moved = BulkEditService.merge_category(cat_id, target_id)
+    except ValueError as e:
+        flash(str(e), "error")
+        return redirect(url_for('categories.index'))
+    flash(f"Categories merged; {moved} transactions moved.", "success")
+    return redirect(url_for('categories.index'))
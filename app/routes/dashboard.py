@@ -5,7 +5,6 @@ from datetime import date
 from flask import Blueprint, render_template, request
 
 from app.services.dashboard_service import DashboardService
-from app.services.recurring_service import RecurringService
 
 
 dashboard_bp = Blueprint('dashboard', __name__)
@@ -16,13 +15,11 @@ def index():
     """Main dashboard page with financial overview and charts."""
     today = date.today()
     
-    # Apply recurring transactions for the current month
-    RecurringService.apply_recurring_for_month(today)
-    
     # Get range selector
     range_key = request.args.get("range", "1")  # "1", "3", "6", "ytd"
     
-    # Get all dashboard data
-    data = DashboardService.get_dashboard_data(today, range_key)
+    # Only the KPI cards are rendered here; the charts fetch their data
+    # from /api/dashboard/* once the page has loaded
+    data = DashboardService.get_summary(today, range_key)
     
     return render_template('index.html', **data)
@@ -0,0 +1,17 @@
+"""
+Debug Blueprint - Request profiles (registered only when PROFILING is on)
+"""
+from flask import Blueprint, render_template
+
+from app.utils.etags import no_etag
+from app.utils.profiling import recent_requests
+
+
+debug_bp = Blueprint('debug', __name__)
+
+
+@debug_bp.route("/requests")
+@no_etag  # Lists in-memory profiles, not database state
+def requests():
+    """Recent requests with their SQL, template and connection timings."""
+    return render_template("debug_requests.html", profiles=recent_requests())
@@ -2,11 +2,13 @@
 Net Worth Blueprint - Routes for net worth tracking
 """
 from datetime import date
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash
 
 from app.repositories.account_repository import AccountRepository
-from app.repositories.net_worth_repository import NetWorthRepository
+from app.repositories.net_worth_repository import NetWorthRepository, HISTORY_STEPS
+from app.utils.downsample import DEFAULT_CHART_POINTS, clamp_points, downsample
 from app.utils.validators import parse_float, dollars_to_cents
+from db import uow
 
 
 net_worth_bp = Blueprint('net_worth', __name__)
@@ -22,7 +24,8 @@ def index():
     accounts = AccountRepository.get_all_ordered_by_type()
     
     if request.method == "POST":
-        # Upsert a balance for each account for the chosen date
+        # Validate every balance before writing any of them
+        balances = []
         for a in accounts:
             raw = request.form.get(f"bal_{a['id']}", "").strip()
             if raw == "":
@@ -33,8 +36,12 @@ def index():
                 flash(f"Invalid balance for {a['name']}. Use a non-negative number.", "error")
                 return redirect(url_for("net_worth.index", as_of=as_of))
             
-            cents = dollars_to_cents(amount)
-            NetWorthRepository.upsert_balance(a["id"], as_of, cents)
+            balances.append((a["id"], dollars_to_cents(amount)))
+        
+        # Upsert a balance for each account for the chosen date
+        with uow():
+            for account_id, cents in balances:
+                NetWorthRepository.upsert_balance(account_id, as_of, cents)
         
         flash(f"Saved balances for {as_of}.", "success")
         return redirect(url_for("net_worth.index", as_of=as_of))
@@ -45,8 +52,23 @@ def index():
     # Compute assets/liabilities/net at the selected as_of date
     summary = NetWorthRepository.get_summary_for_date(as_of)
     
-    # History points
-    history = NetWorthRepository.get_history()
+    # History points, resampled to the chosen step
+    step = request.args.get("step", "snapshot")
+    if step not in HISTORY_STEPS:
+        step = "snapshot"
+    history = NetWorthRepository.get_history(step)
+    
+    # Keep the chart to a bounded number of points however long the history
+    max_points = clamp_points(
+        request.args.get("points"),
+        current_app.config.get("CHART_MAX_POINTS", DEFAULT_CHART_POINTS),
+    )
+    history = downsample(
+        history,
+        max_points,
+        x=lambda r: date.fromisoformat(r["as_of"]).toordinal(),
+        y=lambda r: r["assets"] - r["liabilities"],
+    )
     
     return render_template(
         "net_worth.html",
@@ -57,4 +79,5 @@ def index():
         liabilities=summary["liabilities"],
         net=summary["net"],
         history=history,
+        step=step,
     )
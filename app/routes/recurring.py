@@ -1,18 +1,22 @@
 """
 Recurring Blueprint - Routes for recurring transaction management
 """
+from datetime import date
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 
 from app.repositories.account_repository import AccountRepository
 from app.repositories.category_repository import CategoryRepository
+from app.services.recurring_scheduler import scheduler
 from app.services.recurring_service import RecurringService
-from app.utils.validators import validate_direction, parse_float, parse_int
+from app.utils.etags import no_etag
+from app.utils.validators import validate_direction, validate_frequency, parse_float, parse_int
 
 
 recurring_bp = Blueprint('recurring', __name__)
 
 
 @recurring_bp.route("/", methods=["GET", "POST"])
+@no_etag  # Shows the scheduler's in-memory status
 def index():
     """List recurring items and handle creation."""
     if request.method == "POST":
@@ -32,11 +36,31 @@ def index():
             flash("Invalid direction.", "error")
             return redirect(url_for('recurring.index'))
         
+        # Validate schedule
+        frequency = request.form.get('frequency', 'monthly')
+        if not validate_frequency(frequency):
+            flash("Invalid frequency.", "error")
+            return redirect(url_for('recurring.index'))
+        
+        day_of_month = parse_int(request.form.get("day_of_month") or 1, None)
+        if day_of_month is None or not 1 <= day_of_month <= 31:
+            flash("Day of month must be between 1 and 31.", "error")
+            return redirect(url_for('recurring.index'))
+        
+        start_date = request.form.get("start_date", "").strip() or None
+        if start_date is not None:
+            try:
+                start_date = date.fromisoformat(start_date).isoformat()
+            except ValueError:
+                flash("Start date must be a date (YYYY-MM-DD).", "error")
+                return redirect(url_for('recurring.index'))
+        elif frequency in ("weekly", "biweekly"):
+            start_date = date.today().isoformat()
+        
         # Core fields
         name = request.form["name"]
         account_id = int(request.form["account_id"])
         amount = parse_float(request.form["amount"], 0)
-        day_of_month = int(request.form["day_of_month"])
         active = request.form.get("active") == "on"
         
         RecurringService.create_recurring(
@@ -46,8 +70,11 @@ def index():
             amount=amount,
             day_of_month=day_of_month,
             direction=direction,
-            active=active
+            active=active,
+            frequency=frequency,
+            start_date=start_date,
         )
+        scheduler.wake()
         
         flash("Recurring item added.", "success")
         return redirect(url_for("recurring.index"))
@@ -57,13 +84,24 @@ def index():
     accts = AccountRepository.get_all()
     cats = CategoryRepository.get_all_with_groups()
     
-    return render_template("recurring.html", recs=recs, accts=accts, cats=cats)
+    return render_template(
+        "recurring.html", recs=recs, accts=accts, cats=cats, scheduler=scheduler.status()
+    )
+
+
+@recurring_bp.post("/run")
+def run():
+    """Post any due recurring items immediately."""
+    posted = scheduler.run_now()
+    flash(f"Posted {posted} recurring transaction(s).", "success")
+    return redirect(url_for("recurring.index"))
 
 
 @recurring_bp.post("/<int:rec_id>/toggle")
 def toggle(rec_id):
     """Toggle the active status of a recurring item."""
     RecurringService.toggle_active(rec_id)
+    scheduler.wake()
     flash("Recurring item updated.", "success")
     return redirect(url_for("recurring.index"))
 
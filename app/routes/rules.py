@@ -0,0 +1,60 @@
+"""
+Rules Blueprint - Routes for auto-categorization rules
+"""
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+
+from app.repositories.account_repository import AccountRepository
+from app.repositories.category_repository import CategoryRepository
+from app.repositories.rule_repository import RuleRepository
+from app.repositories.tag_repository import TagRepository
+from app.services.rule_service import RuleService
+
+
+rules_bp = Blueprint('rules', __name__)
+
+
+@rules_bp.route("/", methods=["GET", "POST"])
+def index():
+    """List rules and handle rule creation."""
+    if request.method == "POST":
+        form = request.form
+        try:
+            RuleService.create_rule(
+                match_type=form.get("match_type", "contains"),
+                pattern=form.get("pattern", ""),
+                category_id=int(form["category_id"]),
+                min_amount=(form.get("min_amount") or "").strip(),
+                max_amount=(form.get("max_amount") or "").strip(),
+                account_id=int(form["account_id"]) if form.get("account_id") else None,
+                priority=int(form.get("priority") or 100),
+                tag_ids=[int(t) for t in form.getlist("tag_ids")],
+            )
+            flash("Rule created.", "success")
+        except (KeyError, ValueError) as e:
+            flash(f"Could not create rule: {e}", "error")
+        return redirect(url_for("rules.index"))
+    
+    return render_template(
+        "rules.html",
+        rules=RuleRepository.get_all(),
+        cats=CategoryRepository.get_all(),
+        accts=AccountRepository.get_all(),
+        tags=TagRepository.get_all(),
+    )
+
+
+@rules_bp.post("/<int:rule_id>/delete")
+def delete(rule_id):
+    """Delete a rule."""
+    RuleRepository.delete(rule_id)
+    flash("Rule deleted.", "success")
+    return redirect(url_for("rules.index"))
+
+
+@rules_bp.post("/apply")
+def apply():
+    """Re-run the rules over existing transactions."""
+    only_uncategorized = not request.form.get("all")
+    updated = RuleService.reapply(only_uncategorized=only_uncategorized)
+    flash(f"Rules applied to {updated} transactions.", "success")
+    return redirect(url_for("rules.index"))
@@ -1,10 +1,13 @@
 """
 Tags Blueprint - Routes for tag management
 """
+from datetime import date
+
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 import sqlite3
 
 from app.repositories.tag_repository import TagRepository
+from app.services.tag_service import TagService
 from app.utils.validators import validate_hex_color
 
 
@@ -38,7 +41,8 @@ def index():
         return redirect(url_for("tags.index"))
     
     tags = TagRepository.get_all()
-    return render_template("tags.html", tags=tags)
+    report = TagService.get_monthly_spend(date.today())
+    return render_template("tags.html", tags=tags, report=report)
 
 
 @tags_bp.post("/<int:tag_id>/delete")
@@ -1,28 +1,73 @@
 """
 Transactions Blueprint - Routes for transaction management
 """
-from datetime import date
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+import io
+import os
+
+from flask import (
+    Blueprint, Response, current_app, render_template, request, redirect, url_for, flash,
+    stream_with_context,
+)
 
 from app.repositories.account_repository import AccountRepository
 from app.repositories.category_repository import CategoryRepository
 from app.repositories.tag_repository import TagRepository
 from app.repositories.transaction_repository import TransactionRepository
-from app.services.recurring_service import RecurringService
+from app.services.bulk_edit_service import BulkEditService
+from app.services.export_service import EXPORT_FORMATS, ExportService
+from app.services.import_service import (
+    CsvMapping, ImportService, DEFAULT_BATCH_SIZE, STATEMENT_FORMATS
+)
+from app.services.tag_service import TagService
 from app.utils.validators import validate_direction, parse_float, parse_int, dollars_to_cents
+from db import uow
 
 
 transactions_bp = Blueprint('transactions', __name__)
 
+PAGE_SIZE = 200
+FILTER_ARGS = ("date_from", "date_to", "account_id", "category_id", "tag_id")
+TAG_FILTER_ARGS = ("tags_all", "tags_any", "tags_none")
+
+
+def _int_list(args, name) -> list:
+    return [i for i in (parse_int(v, None) for v in args.getlist(name)) if i is not None]
+
+
+def _parse_filters(args) -> dict:
+    """Read list filters from query-string args; tag expressions go through the bitmap index."""
+    filters = {
+        "date_from": args.get("date_from") or None,
+        "date_to": args.get("date_to") or None,
+        "account_id": parse_int(args.get("account_id"), None),
+        "category_id": parse_int(args.get("category_id"), None),
+        "tag_id": parse_int(args.get("tag_id"), None),
+    }
+    tag_lists = [_int_list(args, name) for name in TAG_FILTER_ARGS]
+    if any(tag_lists):
+        filters["ids"], filters["exclude_ids"] = TagService.match(*tag_lists)
+    return filters
+
+
+def _filter_args(args) -> dict:
+    """The filter args that were set, to carry into links and forms."""
+    filter_args = {k: args[k] for k in FILTER_ARGS if args.get(k)}
+    filter_args.update({k: args.getlist(k) for k in TAG_FILTER_ARGS if args.getlist(k)})
+    return filter_args
+
+
+def _parse_cursor(raw):
+    """Parse a 'YYYY-MM-DD:id' keyset cursor; None if absent or malformed."""
+    if not raw or ":" not in raw:
+        return None
+    date_part, _, id_part = raw.rpartition(":")
+    tx_id = parse_int(id_part, None)
+    return (date_part, tx_id) if tx_id is not None else None
+
 
 @transactions_bp.route("/", methods=["GET", "POST"])
 def index():
     """List transactions and handle transaction creation."""
-    today = date.today()
-    
-    # Apply recurring transactions
-    RecurringService.apply_recurring_for_month(today)
-    
     if request.method == "POST":
         # Validate amount
         amount_raw = request.form.get("amount", "").strip()
@@ -63,33 +108,90 @@ def index():
         else:
             cents = abs(cents)
         
-        # Insert transaction
-        tx_id = TransactionRepository.create(
-            account_id=account_id,
-            date=date_,
-            description=desc,
-            amount_cents=cents,
-            category_id=category_id
-        )
-        
-        # Attach tags
         tag_ids = request.form.getlist("tag_ids")
         tag_ids_int = [parse_int(tid, None) for tid in tag_ids]
         tag_ids_int = [tid for tid in tag_ids_int if tid is not None]
         
-        if tag_ids_int:
-            TransactionRepository.attach_tags(tx_id, tag_ids_int)
+        # Insert transaction and attach tags atomically
+        with uow():
+            tx_id = TransactionRepository.create(
+                account_id=account_id,
+                date=date_,
+                description=desc,
+                amount_cents=cents,
+                category_id=category_id
+            )
+            
+            if tag_ids_int:
+                TransactionRepository.attach_tags(tx_id, tag_ids_int)
         
         flash("Transaction added.", "success")
         return redirect(url_for("transactions.index"))
     
-    # GET: render page
+    # GET: render one keyset page of the filtered list
+    filters = _parse_filters(request.args)
+    before = _parse_cursor(request.args.get("before"))
+    tx = TransactionRepository.get_page(filters, before=before, limit=PAGE_SIZE + 1)
+    
+    next_cursor = None
+    if len(tx) > PAGE_SIZE:
+        tx = tx[:PAGE_SIZE]
+        next_cursor = f"{tx[-1]['date']}:{tx[-1]['id']}"
+    
     tags = TagRepository.get_all()
-    tx = TransactionRepository.get_recent()
     cats = CategoryRepository.get_all_with_groups()
     accts = AccountRepository.get_all()
+    filter_args = _filter_args(request.args)
+    
+    return render_template(
+        "transactions.html",
+        tx=tx,
+        cats=cats,
+        accts=accts,
+        tags=tags,
+        filter_args=filter_args,
+        next_cursor=next_cursor,
+        is_first_page=before is None,
+    )
+
+
+@transactions_bp.route("/search")
+def search():
+    """Full-text search, newest first or by relevance, with keyset paging."""
+    q = request.args.get("q", "").strip()
+    sort = "relevance" if request.args.get("sort") == "relevance" else "date"
+    filters = _parse_filters(request.args)
+    
+    after = None
+    if sort == "date":
+        after = _parse_cursor(request.args.get("after"))
+    else:
+        score_part, _, id_part = (request.args.get("after") or "").rpartition(":")
+        score, tx_id = parse_float(score_part, None), parse_int(id_part, None)
+        if score is not None and tx_id is not None:
+            after = (score, tx_id)
+    
+    tx = TransactionRepository.search(q, filters, sort=sort, after=after, limit=PAGE_SIZE + 1)
+    
+    next_cursor = None
+    if len(tx) > PAGE_SIZE:
+        tx = tx[:PAGE_SIZE]
+        last = tx[-1]
+        key = last["date"] if sort == "date" else repr(last["score"])
+        next_cursor = f"{key}:{last['id']}"
+    
+    search_args = _filter_args(request.args)
+    search_args.update(q=q, sort=sort)
     
-    return render_template("transactions.html", tx=tx, cats=cats, accts=accts, tags=tags)
+    return render_template(
+        "search.html",
+        tx=tx,
+        q=q,
+        sort=sort,
+        search_args=search_args,
+        next_cursor=next_cursor,
+        is_first_page=after is None,
+    )
 
 
 @transactions_bp.post("/<int:tx_id>/delete")
@@ -98,3 +200,113 @@ def delete(tx_id):
     TransactionRepository.delete(tx_id)
     flash("Transaction deleted.", "success")
     return redirect(url_for("transactions.index"))
+
+
+@transactions_bp.post("/bulk")
+def bulk():
+    """Apply one edit to the checked transactions or to everything the filters match."""
+    form = request.form
+    filter_args = _filter_args(form)
+    if form.get("scope") == "filter":
+        filters, ids = _parse_filters(form), None
+    else:
+        filters = None
+        ids = _int_list(form, "ids")
+    
+    try:
+        affected = BulkEditService.apply(
+            form.get("action", ""),
+            filters=filters,
+            ids=ids,
+            category_id=parse_int(form.get("target_category_id"), None),
+            account_id=parse_int(form.get("target_account_id"), None),
+            tag_ids=_int_list(form, "tag_ids"),
+        )
+    except ValueError as e:
+        flash(str(e), "error")
+    else:
+        flash(f"Bulk edit applied to {affected} rows.", "success")
+    return redirect(url_for("transactions.index", **filter_args))
+
+
+@transactions_bp.route("/import", methods=["GET", "POST"])
+def import_file():
+    """Upload a CSV, OFX/QFX or QIF bank statement and import it in batches."""
+    accts = AccountRepository.get_all()
+    
+    if request.method == "POST":
+        upload = request.files.get("file")
+        if upload is None or not upload.filename:
+            flash("Choose a statement file to import.", "error")
+            return redirect(url_for("transactions.import_file"))
+        
+        fmt = STATEMENT_FORMATS.get(os.path.splitext(upload.filename)[1].lower())
+        if fmt is None:
+            flash("Unsupported file type; use .csv, .ofx, .qfx or .qif.", "error")
+            return redirect(url_for("transactions.import_file"))
+        
+        account_id = parse_int(request.form.get("account_id"), None)
+        if account_id is None or AccountRepository.get_by_id(account_id) is None:
+            flash("Choose a default account.", "error")
+            return redirect(url_for("transactions.import_file"))
+        
+        mapping = CsvMapping(
+            date=request.form.get("date_col", "").strip() or "date",
+            amount=request.form.get("amount_col", "").strip() or "amount",
+            description=request.form.get("description_col", "").strip() or None,
+            category=request.form.get("category_col", "").strip() or None,
+            account=request.form.get("account_col", "").strip() or None,
+            date_format=request.form.get("date_format", "").strip() or "%Y-%m-%d",
+            invert_sign=request.form.get("invert_sign") == "on",
+        )
+        
+        fuzzy_days = parse_int(request.form.get("fuzzy_days"), None)
+        if fuzzy_days is not None:
+            fuzzy_days = min(max(fuzzy_days, 0), 14)
+        
+        # Decode the upload as a stream; it is never read into memory whole.
+        # Bank exports are often cp1252/Latin-1, so replace stray bytes rather
+        # than failing partway through, after earlier batches have committed.
+        stream = io.TextIOWrapper(
+            upload.stream,
+            encoding="utf-8-sig",
+            errors="replace",
+            newline="",
+        )
+        result = ImportService.import_file(
+            stream,
+            fmt,
+            account_id,
+            mapping=mapping,
+            day_first=request.form.get("date_format") == "%d/%m/%Y",
+            batch_size=current_app.config.get("IMPORT_BATCH_SIZE", DEFAULT_BATCH_SIZE),
+            on_duplicate="flag" if request.form.get("on_duplicate") == "flag" else "skip",
+            fuzzy_days=fuzzy_days,
+        )
+        
+        flash(f"Import finished: {result.summary()}.", "success")
+        for err in result.errors[:5]:
+            flash(err, "error")
+        return redirect(url_for("transactions.index"))
+    
+    return render_template("import.html", accts=accts)
+
+
+@transactions_bp.route("/export")
+def export():
+    """Stream filtered transactions as CSV or JSON Lines, optionally gzipped."""
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        fmt = "csv"
+    compress = request.args.get("gzip") == "1"
+    filters = _parse_filters(request.args)
+    
+    # stream_with_context keeps the request's connection leased until the
+    # last chunk is sent
+    body = stream_with_context(ExportService.stream(filters, fmt, compress))
+    filename = ExportService.filename(fmt, compress)
+    return Response(
+        body,
+        mimetype="application/gzip" if compress else EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
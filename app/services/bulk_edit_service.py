@@ -0,0 +1,105 @@
+"""
+Bulk Edit Service - Set-based edits over many transactions at once
+"""
+from typing import Dict, List, Optional
+
+from app.repositories.account_repository import AccountRepository
+from app.repositories.category_repository import CategoryRepository
+from app.repositories.monthly_totals_repository import MonthlyTotalsRepository
+from app.repositories.tag_repository import TagRepository
+from app.repositories.transaction_repository import TransactionRepository
+from db import uow
+
+
+BULK_ACTIONS = ("recategorize", "add_tags", "remove_tags", "move_account", "delete")
+
+
+class BulkEditService:
+    """
+    Applies one edit to every transaction matching a filter or id list.
+
+    Each edit is one transaction: the matching ids are staged, which stands
+    the per-row rollup and search-index triggers down, the edit runs as a
+    single UPDATE/DELETE, and the monthly rollup (for the touched months
+    only) and search index are refreshed once at the end.
+    """
+
+    @staticmethod
+    def apply(action: str, filters: Optional[Dict] = None, ids: Optional[List[int]] = None,
+              category_id: Optional[int] = None, account_id: Optional[int] = None,
+              tag_ids: Optional[List[int]] = None) -> int:
+        """
+        Run action on the selected transactions and return the number of
+        rows (or, for tag actions, tag links) affected. Raises ValueError
+        for a bad action, missing or unknown argument or empty selection.
+        """
+        if action not in BULK_ACTIONS:
+            raise ValueError(f"Unknown bulk action: {action}")
+        if not ids and not any(v is not None for v in (filters or {}).values()):
+            raise ValueError("Select transactions or set a filter first")
+        if action == "move_account" and account_id is None:
+            raise ValueError("Choose an account to move to")
+        if action in ("add_tags", "remove_tags") and not tag_ids:
+            raise ValueError("Choose at least one tag")
+        if (action == "recategorize" and category_id is not None
+                and CategoryRepository.get_by_id(category_id) is None):
+            raise ValueError("Unknown category")
+        if action == "move_account" and AccountRepository.get_by_id(account_id) is None:
+            raise ValueError("Unknown account")
+        if action == "add_tags" and not set(tag_ids) <= {t["id"] for t in TagRepository.get_all()}:
+            raise ValueError("Unknown tag")
+
+        with uow():
+            try:
+                if not TransactionRepository.stage_bulk(filters, ids):
+                    return 0
+                return BulkEditService._run(action, category_id, account_id, tag_ids)
+            finally:
+                TransactionRepository.clear_bulk()
+
+    @staticmethod
+    def merge_category(source_id: int, target_id: int) -> int:
+        """
+        Fold category source_id into target_id: its transactions, budgets,
+        recurring items and rules move over, then it is deleted. Returns
+        the number of transactions moved. The rules version triggers see
+        the moved rules, so the cached rule matcher is rebuilt.
+        """
+        if source_id == target_id:
+            raise ValueError("Choose a different category to merge into")
+        if (CategoryRepository.get_by_id(source_id) is None
+                or CategoryRepository.get_by_id(target_id) is None):
+            raise ValueError("Unknown category")
+        with uow():
+            try:
+                moved = 0
+                if TransactionRepository.stage_bulk({"category_id": source_id}):
+                    moved = BulkEditService._run("recategorize", target_id, None, None)
+                CategoryRepository.move_references(source_id, target_id)
+                CategoryRepository.delete(source_id)
+                return moved
+            finally:
+                TransactionRepository.clear_bulk()
+
+    @staticmethod
+    def _run(action: str, category_id: Optional[int], account_id: Optional[int],
+             tag_ids: Optional[List[int]]) -> int:
+        """Apply action to the staged rows and refresh what it invalidated."""
+        if action == "move_account":
+            # Neither the rollup nor the search index covers accounts
+            return TransactionRepository.bulk_move_account(account_id)
+
+        months = TransactionRepository.get_staged_months()
+        TransactionRepository.unindex_staged()
+        if action == "recategorize":
+            affected = TransactionRepository.bulk_set_category(category_id)
+        elif action == "add_tags":
+            affected = TransactionRepository.bulk_add_tags(tag_ids)
+        elif action == "remove_tags":
+            affected = TransactionRepository.bulk_remove_tags(tag_ids)
+        else:
+            affected = TransactionRepository.bulk_delete()
+        TransactionRepository.index_staged()
+        if action in ("recategorize", "delete"):
+            MonthlyTotalsRepository.rebuild_months(months)
+        return affected
@@ -6,58 +6,102 @@ from typing import Dict, List
 
 from app.repositories.budget_repository import BudgetRepository
 from app.repositories.category_repository import CategoryGroupRepository
+from app.repositories.dashboard_repository import DashboardRepository
 from app.repositories.transaction_repository import TransactionRepository
-from app.repositories.user_repository import UserRepository
+from app.utils.cache import GenerationCache
 from app.utils.date_helpers import month_key, month_seq, add_months, month_key_from_ym
+from app.utils.downsample import DEFAULT_CHART_POINTS, lttb_indices
 from calculations import pro_rata, daily_cap
+from db import data_generation
+
+
+CHARTS = ("categories", "groups", "trend", "top-categories")
+
+
+def _range_start(today: date, range_key: str) -> str:
+    """First month key of the trend range ("1", "3", "6" months or "ytd")."""
+    if range_key == "3":
+        return month_key_from_ym(*add_months(today.year, today.month, -2))
+    if range_key == "6":
+        return month_key_from_ym(*add_months(today.year, today.month, -5))
+    if range_key == "ytd":
+        return f"{today.year:04d}-01"
+    return month_key(today)
 
 
 class DashboardService:
     """Handles business logic for dashboard data and calculations."""
     
+    # Results keyed by (part, today, range_key), dropped on any database write
+    cache = GenerationCache(max_size=64)
+    
     @staticmethod
-    def get_dashboard_data(today: date, range_key: str = "1") -> Dict:
+    def get_summary(today: date, range_key: str = "1") -> Dict:
         """
-        Get all dashboard data including metrics, charts, and trends.
+        Get the dashboard's headline numbers (the KPI cards). Charts are
+        loaded separately through get_chart().
+        
+        Results are served from memory until the next database write.
         
         Args:
             today: Current date
             range_key: Range selector ("1", "3", "6", "ytd")
         
         Returns:
-            Dictionary containing all dashboard data
+            Dictionary of month keys and KPI values in cents
+        """
+        return DashboardService.cache.get_or_compute(
+            ("summary", today, range_key),
+            data_generation(),
+            lambda: DashboardService._compute_summary(today, range_key),
+        )
+    
+    @staticmethod
+    def get_chart(name: str, today: date, range_key: str = "1",
+                  max_points: int = DEFAULT_CHART_POINTS) -> Dict:
         """
+        Get one chart's data as columns: parallel lists of labels and cents.
+        Each chart is computed and cached on its own.
+        
+        Args:
+            name: One of CHARTS
+            today: Current date
+            range_key: Range selector ("1", "3", "6", "ytd")
+            max_points: Longest series to return; the trend is downsampled to it
+        """
+        if name not in CHARTS:
+            raise ValueError(f"Unknown chart: {name}")
+        return DashboardService.cache.get_or_compute(
+            (name, today, range_key, max_points),
+            data_generation(),
+            lambda: DashboardService._compute_chart(name, today, range_key, max_points),
+        )
+    
+    @staticmethod
+    def cache_stats() -> Dict:
+        """Get hit/miss/eviction counters for the dashboard cache."""
+        return DashboardService.cache.stats()
+    
+    @staticmethod
+    def _compute_summary(today: date, range_key: str) -> Dict:
+        """Build the KPI values from the database."""
         mkey = month_key(today)
-        year, month = today.year, today.month
-        
-        # Compute range start month key
-        if range_key == "3":
-            start_y, start_m = add_months(year, month, -2)
-            start_mkey = month_key_from_ym(start_y, start_m)
-        elif range_key == "6":
-            start_y, start_m = add_months(year, month, -5)
-            start_mkey = month_key_from_ym(start_y, start_m)
-        elif range_key == "ytd":
-            start_mkey = f"{year:04d}-01"
-        else:
-            start_mkey = mkey
-        
-        months = month_seq(start_mkey, mkey)
-        
-        # Get user salary
-        salary_annual = UserRepository.get_salary() or 0
-        salary_est = salary_annual // 12
+        
+        # Salary, income, total budget and spending in one statement
+        summary = DashboardRepository.get_month_summary(mkey)
+        
+        salary_est = summary.salary_annual // 12
         
         # Income for current month
-        income_monthly = TransactionRepository.get_income_for_month(mkey)
+        income_monthly = summary.income
         if income_monthly == 0:
             income_monthly = salary_est
         
         # Total budget
-        B_total = BudgetRepository.get_total_for_month(mkey)
+        B_total = summary.budget_total
         
         # Month to date spending
-        S_so_far = TransactionRepository.get_spending_for_month(mkey)
+        S_so_far = summary.spent
         
         # Pro-rata calculations
         pr = pro_rata(B_total, today)
@@ -67,18 +111,6 @@ class DashboardService:
         # Monthly savings estimate
         savings_month = income_monthly - S_so_far
         
-        # Category breakdown for chart
-        cat_rows = BudgetRepository.get_category_breakdown(mkey)
-        
-        # Group breakdown for table/chart
-        group_rows = CategoryGroupRepository.get_group_breakdown(mkey)
-        
-        # Trend chart data
-        trend_data = DashboardService._get_trend_data(months, start_mkey, mkey)
-        
-        # Top categories in range
-        top_cats_range = TransactionRepository.get_top_categories_in_range(start_mkey, mkey)
-        
         return {
             "today": today,
             "mkey": mkey,
@@ -88,17 +120,52 @@ class DashboardService:
             "variance": variance,
             "cap": cap,
             "savings_month": savings_month,
-            "cats": cat_rows,
-            "groups": group_rows,
             "range_key": range_key,
-            "start_mkey": start_mkey,
-            "trend": trend_data["trend"],
-            "ma3": trend_data["ma3"],
-            "top_cats_range": top_cats_range,
+            "start_mkey": _range_start(today, range_key),
+        }
+    
+    @staticmethod
+    def _compute_chart(name: str, today: date, range_key: str, max_points: int) -> Dict:
+        """Build one chart's columns from the database."""
+        mkey = month_key(today)
+        start_mkey = _range_start(today, range_key)
+        
+        if name == "categories":
+            rows = BudgetRepository.get_category_breakdown(mkey)
+            return {
+                "labels": [r["name"] for r in rows],
+                "budget": [r["budget"] for r in rows],
+                "spent": [r["spent"] for r in rows],
+            }
+        
+        if name == "groups":
+            rows = CategoryGroupRepository.get_group_breakdown(mkey)
+            return {
+                "labels": [r["group_name"] for r in rows],
+                "type": [r["group_type"] for r in rows],
+                "budget": [r["budget"] for r in rows],
+                "spent": [r["spent"] for r in rows],
+            }
+        
+        if name == "trend":
+            months = month_seq(start_mkey, mkey)
+            trend_data = DashboardService._get_trend_data(months, start_mkey, mkey, max_points)
+            return {
+                "labels": [r["mkey"] for r in trend_data["trend"]],
+                "spent": [r["spent"] for r in trend_data["trend"]],
+                "income": [r["income"] for r in trend_data["trend"]],
+                "ma3": [round(v) for v in trend_data["ma3"]],
+            }
+        
+        rows = TransactionRepository.get_top_categories_in_range(start_mkey, mkey)
+        return {
+            "labels": [r["category"] for r in rows],
+            "spent": [r["spent"] for r in rows],
         }
     
     @staticmethod
-    def _get_trend_data(months: List[str], start_mkey: str, end_mkey: str) -> Dict:
+    def _get_trend_data(months: List[str], start_mkey: str, end_mkey: str,
+                        max_points: int = DEFAULT_CHART_POINTS) -> Dict:
         """Calculate trend data including moving averages."""
         # Initialize trend map
         trend_map = {
@@ -125,6 +192,13 @@ class DashboardService:
             window = spent_vals[max(0, i - 2): i + 1]
             ma3.append(sum(window) / len(window))
         
+        # Bound the chart's points for long ranges; the average above is
+        # taken over the full series first
+        if len(trend) > max_points:
+            kept = lttb_indices(range(len(trend)), spent_vals, max_points)
+            trend = [trend[i] for i in kept]
+            ma3 = [ma3[i] for i in kept]
+        
         return {
             "trend": trend,
             "ma3": ma3
@@ -0,0 +1,84 @@
+"""
+Export Service - Streaming CSV / JSON Lines export of transactions
+"""
+import csv
+import io
+import json
+import zlib
+from typing import Dict, Iterator
+
+from app.repositories.transaction_repository import TransactionRepository
+
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+CSV_COLUMNS = ["id", "date", "account", "category", "description", "amount", "tags"]
+
+
+def _amount(cents: int) -> str:
+    """Exact decimal string for cents, e.g. -1234 -> "-12.34"."""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def _csv_chunks(filters: Dict) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for rows in TransactionRepository.iter_export(filters):
+        writer.writerows(
+            (r["id"], r["date"], r["account"], r["category"] or "", r["description"] or "",
+             _amount(r["amount_cents"]), r["tags"] or "")
+            for r in rows
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _jsonl_chunks(filters: Dict) -> Iterator[str]:
+    for rows in TransactionRepository.iter_export(filters):
+        yield "".join(
+            json.dumps({
+                "id": r["id"],
+                "date": r["date"],
+                "account": r["account"],
+                "category": r["category"],
+                "description": r["description"],
+                "amount_cents": r["amount_cents"],
+                "tags": r["tags"].split(";") if r["tags"] else [],
+            }) + "\n"
+            for r in rows
+        )
+
+
+class ExportService:
+    """Produces transaction exports as a stream of byte chunks."""
+
+    @staticmethod
+    def stream(filters: Dict, fmt: str = "csv", compress: bool = False) -> Iterator[bytes]:
+        """
+        Yield the export in chunks of a few thousand rows as they are read,
+        optionally gzip-compressed. Nothing is buffered beyond one chunk.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        chunks = _csv_chunks(filters) if fmt == "csv" else _jsonl_chunks(filters)
+        if not compress:
+            for text in chunks:
+                if text:
+                    yield text.encode("utf-8")
+            return
+        gz = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+        for text in chunks:
+            data = gz.compress(text.encode("utf-8"))
+            if data:
+                yield data
+        yield gz.flush()
+
+    @staticmethod
+    def filename(fmt: str, compress: bool) -> str:
+        return f"transactions.{fmt}" + (".gz" if compress else "")
@@ -0,0 +1,454 @@
+"""
+Import Service - Streaming bulk import of bank statements
+"""
+import csv
+import html
+import re
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from app.repositories.account_repository import AccountRepository
+from app.repositories.category_repository import CategoryRepository
+from app.repositories.tag_repository import TagRepository
+from app.repositories.rule_repository import RuleRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.services.rule_service import RuleService
+from app.utils.fingerprint import first_free_fingerprint
+from app.utils.validators import parse_cents
+from db import uow
+
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_BATCHES_PER_COMMIT = 10
+MAX_ERRORS_KEPT = 20
+DUPLICATE_TAG = ("Possible duplicate", "#f59e0b")
+READ_CHUNK_CHARS = 1 << 16
+
+# File extension -> statement format understood by ImportService.import_file()
+STATEMENT_FORMATS = {".csv": "csv", ".ofx": "ofx", ".qfx": "ofx", ".qif": "qif"}
+
+# OFX 1.x is SGML (leaf tags are never closed), 2.x is XML; this matches both
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+@dataclass
+class CsvMapping:
+    """Which CSV columns hold which transaction fields."""
+    date: str = "date"
+    amount: str = "amount"
+    description: Optional[str] = "description"
+    category: Optional[str] = None
+    account: Optional[str] = None
+    date_format: str = "%Y-%m-%d"
+    invert_sign: bool = False  # for banks that export expenses as positive numbers
+
+
+@dataclass
+class ImportResult:
+    """Counters reported while and after an import runs."""
+    rows_read: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    flagged: int = 0
+    uncategorized: int = 0
+    elapsed: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        flagged = f", {self.flagged} flagged as possible duplicates" if self.flagged else ""
+        return (
+            f"{self.inserted} imported, {self.duplicates} duplicates skipped{flagged}, "
+            f"{self.skipped} unreadable, "
+            f"{self.uncategorized} uncategorized from {self.rows_read} rows "
+            f"in {self.elapsed:.2f}s ({self.rows_per_second:,.0f} rows/s)"
+        )
+
+
+# Statements repeat a few hundred distinct dates, so parse each one once
+@lru_cache(maxsize=4096)
+def _parse_date(value: str, fmt: str) -> str:
+    value = value.strip()
+    if fmt == "%Y-%m-%d":
+        return date.fromisoformat(value[:10]).isoformat()
+    return datetime.strptime(value, fmt).date().isoformat()
+
+
+def _column(row: Dict, name: Optional[str]) -> Optional[str]:
+    """Stripped value of an optional mapped column, or None."""
+    if not name:
+        return None
+    return (row.get(name) or "").strip() or None
+
+
+def read_csv(stream: TextIO, mapping: CsvMapping) -> Iterator[Optional[Dict]]:
+    """
+    Yield one normalized record per CSV row, or None for a row that cannot be
+    parsed. Records have date (ISO), amount_cents (signed), description,
+    category and account (names or None).
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        try:
+            cents = parse_cents(row[mapping.amount])
+            if cents is None:
+                yield None
+                continue
+            yield {
+                "date": _parse_date(row[mapping.date], mapping.date_format),
+                "amount_cents": -cents if mapping.invert_sign else cents,
+                "description": _column(row, mapping.description),
+                "category": _column(row, mapping.category),
+                "account": _column(row, mapping.account),
+            }
+        except (KeyError, ValueError, TypeError, OverflowError):
+            yield None
+
+
+@lru_cache(maxsize=4096)
+def _parse_ofx_date(value: str) -> str:
+    # YYYYMMDD[HHMMSS[.XXX]][[-5:EST]]; only the calendar date matters here
+    return date(int(value[:4]), int(value[4:6]), int(value[6:8])).isoformat()
+
+
+@lru_cache(maxsize=4096)
+def _parse_qif_date(value: str, day_first: bool) -> str:
+    # Quicken writes 10/1/2026, 10/ 1/26, 10/1'26 or 10-01-2026
+    parts = re.split(r"[/\-.']", value.replace(" ", ""))
+    if len(parts) != 3:
+        raise ValueError(f"bad QIF date {value!r}")
+    first, second, year = (int(p) for p in parts)
+    if len(parts[0]) == 4:  # ISO-ish YYYY-MM-DD
+        first, second, year = second, year, first
+        day_first = False
+    if year < 100:
+        year += 2000 if year < 70 else 1900
+    month, day = (second, first) if day_first else (first, second)
+    return date(year, month, day).isoformat()
+
+
+def _ofx_cents(value: str) -> Optional[int]:
+    value = value.strip()
+    if "," in value and "." not in value:  # decimal comma, e.g. "-12,50"
+        value = value.replace(",", ".")
+    return parse_cents(value)
+
+
+def read_ofx(stream: TextIO) -> Iterator[Optional[Dict]]:
+    """
+    Yield one normalized record per <STMTTRN> in an OFX/QFX file (SGML or
+    XML flavour), reading the stream in fixed-size chunks.
+    """
+    buffer = ""
+    txn = None
+    while True:
+        chunk = stream.read(READ_CHUNK_CHARS)
+        buffer += chunk
+        # Keep a possibly incomplete trailing tag for the next chunk
+        cut = buffer.rfind("<") if chunk else len(buffer)
+        for closing, tag, text in _OFX_TAG.findall(buffer, 0, cut):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing:
+                    yield _ofx_record(txn)
+                    txn = None
+                else:
+                    txn = {}
+            elif txn is not None and not closing:
+                text = text.strip()
+                if text:
+                    txn[tag] = text
+        buffer = buffer[cut:]
+        if not chunk:
+            return
+
+
+def _ofx_record(txn: Optional[Dict]) -> Optional[Dict]:
+    if not txn:
+        return None
+    try:
+        cents = _ofx_cents(txn["TRNAMT"])
+        if cents is None:
+            return None
+        payee = txn.get("NAME") or txn.get("PAYEE") or txn.get("MEMO")
+        return {
+            "date": _parse_ofx_date(txn["DTPOSTED"]),
+            "amount_cents": cents,
+            "description": html.unescape(payee) if payee else None,
+            "category": None,
+            "account": None,
+        }
+    except (KeyError, ValueError, OverflowError):
+        return None
+
+
+def read_qif(stream: TextIO, day_first: bool = False) -> Iterator[Optional[Dict]]:
+    """
+    Yield one normalized record per QIF transaction, line by line. Account
+    names from !Account blocks are carried onto the records that follow;
+    categories keep their last "Parent:Child" segment and transfers
+    ("[Account]") are left uncategorized.
+    """
+    fields = {}
+    account = None
+    in_account_block = False
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if not line:
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == "!":
+            in_account_block = value.lower() == "account"
+            fields = {}
+            continue
+        if code != "^":
+            # Split transactions repeat S/E/$ lines; the first value wins
+            fields.setdefault(code, value)
+            continue
+        if in_account_block:
+            account = fields.get("N") or account
+            in_account_block = False
+        elif fields:
+            yield _qif_record(fields, account, day_first)
+        fields = {}
+    if fields and not in_account_block:
+        yield _qif_record(fields, account, day_first)
+
+
+def _qif_record(fields: Dict, account: Optional[str], day_first: bool) -> Optional[Dict]:
+    try:
+        cents = parse_cents(fields.get("T") or fields.get("U"))
+        if cents is None:
+            return None
+        category = fields.get("L") or None
+        if category and category.startswith("["):
+            category = None
+        elif category:
+            category = category.split("/")[0].rsplit(":", 1)[-1] or None
+        return {
+            "date": _parse_qif_date(fields["D"], day_first),
+            "amount_cents": cents,
+            "description": fields.get("P") or fields.get("M") or None,
+            "category": category,
+            "account": account,
+        }
+    except (KeyError, ValueError, OverflowError):
+        return None
+
+
+class DuplicateScreen:
+    """
+    Keys of existing transactions for the dates an import touches, loaded
+    lazily as batches arrive so each date range is queried once.
+
+    Exact mode compares fingerprints (account, date, amount, normalized
+    description). Fuzzy mode instead matches the same account and amount
+    within +/- fuzzy_days, taking the nearest unmatched existing date from
+    a sorted list per (account, amount).
+    """
+
+    def __init__(self, fuzzy_days: Optional[int] = None):
+        self.fuzzy_days = fuzzy_days
+        self.existing = set()  # fingerprints already stored
+        self.claimed = set()  # fingerprints matched or inserted by this import
+        self.dates_by_amount = {}  # (account_id, amount_cents) -> sorted date ordinals
+        self.loaded: Optional[Tuple[date, date]] = None
+
+    def cover(self, first: str, last: str) -> None:
+        """Make sure keys for [first, last] (widened for fuzzy mode) are loaded."""
+        pad = timedelta(days=self.fuzzy_days or 0)
+        start, end = date.fromisoformat(first) - pad, date.fromisoformat(last) + pad
+        if self.loaded is None:
+            self._load(start, end)
+            self.loaded = (start, end)
+            return
+        lo, hi = self.loaded
+        if start < lo:
+            self._load(start, lo - timedelta(days=1))
+        if end > hi:
+            self._load(hi + timedelta(days=1), end)
+        self.loaded = (min(start, lo), max(end, hi))
+
+    def _load(self, start: date, end: date) -> None:
+        for fp, account_id, amount_cents, day in TransactionRepository.get_import_keys(
+            start.isoformat(), end.isoformat()
+        ):
+            self.existing.add(fp)
+            if self.fuzzy_days is not None:
+                insort(self.dates_by_amount.setdefault((account_id, amount_cents), []),
+                       date.fromisoformat(day).toordinal())
+
+    def is_duplicate(self, account_id: int, day: str, amount_cents: int,
+                     description: Optional[str]) -> bool:
+        """Whether this row matches an existing transaction not yet matched."""
+        if self.fuzzy_days is not None:
+            return self._match_nearby(account_id, day, amount_cents)
+        fp = first_free_fingerprint(
+            account_id, day, amount_cents, description, self.claimed.__contains__
+        )
+        if fp in self.existing:
+            self.claimed.add(fp)
+            return True
+        return False
+
+    def new_fingerprint(self, account_id: int, day: str, amount_cents: int,
+                        description: Optional[str]) -> int:
+        """Fingerprint to store a row under, unused by the table and this import."""
+        fp = first_free_fingerprint(
+            account_id, day, amount_cents, description,
+            lambda f: f in self.claimed or f in self.existing,
+        )
+        self.claimed.add(fp)
+        return fp
+
+    def _match_nearby(self, account_id: int, day: str, amount_cents: int) -> bool:
+        candidates = self.dates_by_amount.get((account_id, amount_cents))
+        if not candidates:
+            return False
+        target = date.fromisoformat(day).toordinal()
+        i = bisect_left(candidates, target - self.fuzzy_days)
+        best = None
+        while i < len(candidates) and candidates[i] <= target + self.fuzzy_days:
+            if best is None or abs(candidates[i] - target) < abs(candidates[best] - target):
+                best = i
+            i += 1
+        if best is None:
+            return False
+        # Each existing transaction can absorb only one imported row
+        del candidates[best]
+        return True
+
+
+class ImportService:
+    """Handles batched, chunked-transaction imports of normalized records."""
+
+    @staticmethod
+    def import_records(records: Iterable[Optional[Dict]], default_account_id: int,
+                       batch_size: int = DEFAULT_BATCH_SIZE,
+                       batches_per_commit: int = DEFAULT_BATCHES_PER_COMMIT,
+                       progress: Optional[Callable[[ImportResult], None]] = None,
+                       on_duplicate: str = "skip",
+                       fuzzy_days: Optional[int] = None) -> ImportResult:
+        """
+        Insert records with executemany in batches of batch_size, committing
+        every batches_per_commit batches. Records are consumed lazily, so
+        the file is never held in memory.
+
+        Categories and accounts are resolved by case-insensitive name from
+        maps loaded once up front; unknown accounts fall back to
+        default_account_id. Rows without a known category go through the
+        auto-categorization rules, which may also tag them.
+
+        Rows matching an existing transaction (see DuplicateScreen) are
+        skipped, or with on_duplicate="flag" imported and tagged
+        "Possible duplicate".
+        """
+        category_ids = {r["name"].lower(): r["id"] for r in CategoryRepository.get_all()}
+        account_ids = {r["name"].lower(): r["id"] for r in AccountRepository.get_all()}
+        screen = DuplicateScreen(fuzzy_days)
+        flag_tag_id = TagRepository.get_or_create(*DUPLICATE_TAG) if on_duplicate == "flag" else None
+        matcher = RuleService.get_matcher()
+        rule_hits: Counter = Counter()
+        result = ImportResult()
+        started = time.perf_counter()
+
+        def prepare(batch: List[Optional[Dict]]) -> Tuple[List[tuple], Dict[int, List[int]]]:
+            """
+            Turn parsed records into insert rows, dropping or flagging
+            duplicates. Also returns tag id -> fingerprints to tag.
+            """
+            valid = []
+            for row_number, rec in enumerate(batch, start=result.rows_read + 1):
+                if rec is not None:
+                    valid.append(rec)
+                    continue
+                result.skipped += 1
+                if len(result.errors) < MAX_ERRORS_KEPT:
+                    result.errors.append(f"Row {row_number}: could not parse")
+            if valid:
+                screen.cover(min(r["date"] for r in valid), max(r["date"] for r in valid))
+            rows, to_tag = [], {}
+            for rec in valid:
+                account_id = account_ids.get(
+                    (rec.get("account") or "").strip().lower(), default_account_id
+                )
+                key = (account_id, rec["date"], rec["amount_cents"], rec.get("description"))
+                if screen.is_duplicate(*key):
+                    if flag_tag_id is None:
+                        result.duplicates += 1
+                        continue
+                    fp = screen.new_fingerprint(*key)
+                    to_tag.setdefault(flag_tag_id, []).append(fp)
+                    result.flagged += 1
+                else:
+                    fp = screen.new_fingerprint(*key)
+                category_id = category_ids.get((rec.get("category") or "").strip().lower())
+                if category_id is None:
+                    rule = matcher.match(rec.get("description"), rec["amount_cents"], account_id)
+                    if rule is not None:
+                        category_id = rule["category_id"]
+                        rule_hits[rule["id"]] += 1
+                        for tag_id in rule["tag_ids"]:
+                            to_tag.setdefault(tag_id, []).append(fp)
+                if category_id is None:
+                    result.uncategorized += 1
+                rows.append((account_id, rec["date"], rec.get("description"),
+                             rec["amount_cents"], category_id, fp))
+            result.rows_read += len(batch)
+            return rows, to_tag
+
+        pending = iter(records)
+        done = False
+        while not done:
+            with uow():
+                for _ in range(batches_per_commit):
+                    batch = list(islice(pending, batch_size))
+                    if not batch:
+                        done = True
+                        break
+                    rows, to_tag = prepare(batch)
+                    inserted = TransactionRepository.insert_many(rows)
+                    # Rows another writer stored meanwhile are ignored by the insert
+                    result.duplicates += len(rows) - inserted
+                    result.inserted += inserted
+                    for tag_id, fingerprints in to_tag.items():
+                        TransactionRepository.tag_by_fingerprints(fingerprints, tag_id)
+                RuleRepository.add_hits(rule_hits)
+                rule_hits.clear()
+            result.elapsed = time.perf_counter() - started
+            if progress is not None:
+                progress(result)
+        return result
+
+    @staticmethod
+    def import_csv(stream: TextIO, mapping: CsvMapping, default_account_id: int,
+                   **options) -> ImportResult:
+        """Stream a CSV file through import_records()."""
+        return ImportService.import_records(
+            read_csv(stream, mapping), default_account_id, **options
+        )
+
+    @staticmethod
+    def import_file(stream: TextIO, fmt: str, default_account_id: int,
+                    mapping: Optional[CsvMapping] = None, day_first: bool = False,
+                    **options) -> ImportResult:
+        """Import a statement in any of STATEMENT_FORMATS' formats."""
+        if fmt == "csv":
+            records = read_csv(stream, mapping or CsvMapping())
+        elif fmt == "ofx":
+            records = read_ofx(stream)
+        elif fmt == "qif":
+            records = read_qif(stream, day_first)
+        else:
+            raise ValueError(f"Unsupported statement format: {fmt}")
+        return ImportService.import_records(records, default_account_id, **options)
@@ -0,0 +1,103 @@
+"""
+Recurring Scheduler - Posts recurring transactions off the request path
+"""
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from app.services.recurring_service import RecurringService
+
+
+logger = logging.getLogger(__name__)
+
+
+class RecurringScheduler:
+    """
+    Background thread that runs the recurring engine at startup, at every
+    day rollover, every `interval` seconds, and whenever run_now() is called.
+    """
+
+    def __init__(self, interval: float = 300.0, clock: Callable[[], datetime] = datetime.now):
+        self.interval = interval
+        self.clock = clock
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._run_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._status = {
+            "runs": 0,
+            "last_run": None,
+            "last_posted": 0,
+            "total_posted": 0,
+            "last_error": None,
+        }
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """Start the background thread (no-op if it is already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if interval is not None:
+                self.interval = interval
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, name="recurring-scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def wake(self) -> None:
+        """Ask the background thread to run as soon as possible."""
+        self._wake.set()
+
+    def run_now(self, today: Optional[date] = None) -> int:
+        """Run the recurring engine in the calling thread; return occurrences posted."""
+        today = today or self.clock().date()
+        with self._run_lock:
+            try:
+                posted = RecurringService.apply_recurring(today)
+            except Exception as exc:
+                self._status["last_error"] = repr(exc)
+                raise
+            self._status["runs"] += 1
+            self._status["last_run"] = self.clock()
+            self._status["last_posted"] = posted
+            self._status["total_posted"] += posted
+            self._status["last_error"] = None
+        return posted
+
+    def status(self) -> Dict:
+        with self._run_lock:
+            return dict(
+                self._status,
+                running=self._thread is not None and self._thread.is_alive(),
+                interval=self.interval,
+            )
+
+    def _seconds_until_next_run(self) -> float:
+        now = self.clock()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        # One second past midnight so the run sees the new date
+        return max(0.0, min(self.interval, (midnight - now).total_seconds() + 1))
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_now()
+            except Exception:
+                logger.exception("Recurring posting failed")
+            self._wake.wait(self._seconds_until_next_run())
+            self._wake.clear()
+
+
+scheduler = RecurringScheduler()
@@ -1,65 +1,82 @@
 """
 Recurring Service - Business logic for recurring transactions
 """
-from calendar import monthrange
-from datetime import date
-from typing import List
+import logging
+from datetime import date, timedelta
+from typing import List, Optional
 
 from app.repositories.recurring_repository import RecurringRepository
-from app.repositories.transaction_repository import TransactionRepository
+from app.utils.schedules import occurrences
+from db import uow
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
 
 
 class RecurringService:
     """Handles business logic for recurring transactions."""
     
     @staticmethod
-    def apply_recurring_for_month(today: date) -> None:
+    def apply_recurring(today: date) -> int:
         """
-        Ensures recurring expenses up to today exist as transactions for this month.
-        Uses calendar.monthrange to tie day_of_month to last day of month.
+        Ensures every recurring occurrence up to today exists as a transaction.
         
-        Python docs: https://docs.python.org/3/library/calendar.html#calendar.monthrange
+        Each item carries a posted_through watermark, so when nothing is due
+        this is a single indexed query. Otherwise occurrences are expanded from
+        each watermark to today, across any number of missed months, and
+        inserted as one batch in one transaction; the unique
+        (recurring_id, date) index makes concurrent runs harmless.
+        Items that have never run start from the first of the current month.
+        An item with an unparseable date is logged and skipped, and its
+        watermark left alone, without holding up the others.
+        Returns the number of transactions posted.
         """
-        year, month = today.year, today.month
-        days_in_month = monthrange(year, month)[1]
+        today_str = today.isoformat()
+        pending = RecurringRepository.get_pending(today_str)
+        if not pending:
+            return 0
         
-        recs = RecurringRepository.get_all_active()
-        
-        for r in recs:
-            # Tie day_of_month to last day of month
-            d = min(r["day_of_month"], days_in_month)
-            
-            # Only create if that day is <= today
-            if d > today.day:
-                continue
-            
-            dt_str = f"{year:04d}-{month:02d}-{d:02d}"
-            
-            # Check if we already created a transaction for this recurring item on that date
-            if TransactionRepository.check_exists_for_recurring(r["id"], dt_str):
+        default_after = today.replace(day=1) - timedelta(days=1)
+        rows = []
+        advanced = []
+        for r in pending:
+            try:
+                after = _parse_date(r["posted_through"]) or default_after
+                anchor = _parse_date(r["start_date"])
+            except ValueError:
+                logger.warning(
+                    "Skipping recurring item %s (%r): bad start_date %r or posted_through %r",
+                    r["id"], r["name"], r["start_date"], r["posted_through"],
+                )
                 continue
+            advanced.append(r["id"])
             
             # Convert stored amount into signed transaction amount
-            direction = r["direction"]
             amt = abs(r["amount_cents"])
-            if direction == "in":
-                amt = amt
-            else:
+            if r["direction"] != "in":
                 amt = -amt
             
-            TransactionRepository.create(
-                account_id=r["account_id"],
-                date=dt_str,
-                description=r["name"],
-                amount_cents=amt,
-                category_id=r["category_id"],
-                recurring_id=r["id"]
-            )
+            for d in occurrences(r["frequency"], r["day_of_month"], anchor, after, today):
+                rows.append(
+                    (r["account_id"], d.isoformat(), r["name"], amt, r["category_id"], r["id"])
+                )
+        
+        if not advanced:
+            return 0
+        
+        with uow():
+            posted = RecurringRepository.post_occurrences(rows) if rows else 0
+            RecurringRepository.advance_watermarks(advanced, today_str)
+        return posted
     
     @staticmethod
     def create_recurring(name: str, account_id: int, category_id: int, 
                         amount: float, day_of_month: int, direction: str, 
-                        active: bool = True) -> int:
+                        active: bool = True, frequency: str = "monthly",
+                        start_date: Optional[str] = None) -> int:
         """Create a new recurring transaction."""
         amount_cents = int(round(amount * 100))
         active_int = 1 if active else 0
@@ -71,7 +88,9 @@ class RecurringService:
             amount_cents=amount_cents,
             day_of_month=day_of_month,
             direction=direction,
-            active=active_int
+            active=active_int,
+            frequency=frequency,
+            start_date=start_date,
         )
     
     @staticmethod
@@ -80,9 +99,11 @@ class RecurringService:
         return RecurringRepository.get_all_with_details()
     
     @staticmethod
-    def toggle_active(recurring_id: int) -> None:
-        """Toggle the active status of a recurring item."""
-        RecurringRepository.toggle_active(recurring_id)
+    def toggle_active(recurring_id: int, today: Optional[date] = None) -> None:
+        """Toggle an item; re-enabled items resume with the current month."""
+        today = today or date.today()
+        resume_after = today.replace(day=1) - timedelta(days=1)
+        RecurringRepository.toggle_active(recurring_id, resume_after.isoformat())
     
     @staticmethod
     def delete(recurring_id: int) -> None:
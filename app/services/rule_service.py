@@ -0,0 +1,105 @@
+"""
+Rule Service - Business logic for auto-categorization rules
+"""
+import re
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from app.repositories.account_repository import AccountRepository
+from app.repositories.category_repository import CategoryRepository
+from app.repositories.rule_repository import RuleRepository
+from app.repositories.tag_repository import TagRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.utils.rule_matcher import MATCH_TYPES, RuleMatcher
+from app.utils.validators import parse_cents
+from db import uow
+
+
+REAPPLY_BATCH_SIZE = 5000
+
+# (rules version, matcher) of the last compiled rule set
+_compiled: Optional[Tuple[int, RuleMatcher]] = None
+
+
+class RuleService:
+    """Handles business logic for auto-categorization rules."""
+
+    @staticmethod
+    def get_matcher() -> RuleMatcher:
+        """
+        The compiled matcher for the current rules. It is rebuilt only when
+        the rules version changes, so callers can ask once per batch.
+        """
+        global _compiled
+        version = RuleRepository.get_version()
+        if _compiled is None or _compiled[0] != version:
+            _compiled = (version, RuleMatcher(RuleRepository.get_all()))
+        return _compiled[1]
+
+    @staticmethod
+    def create_rule(match_type: str, pattern: str, category_id: int,
+                    min_amount: str = "", max_amount: str = "",
+                    account_id: Optional[int] = None, priority: int = 100,
+                    tag_ids: Optional[List[int]] = None) -> int:
+        """Validate and create a rule. Raises ValueError on bad input."""
+        if match_type not in MATCH_TYPES:
+            raise ValueError(f"Unknown match type: {match_type}")
+        pattern = (pattern or "").strip()
+        if match_type == "regex":
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression: {e}")
+        min_cents = parse_cents(min_amount) if min_amount else None
+        max_cents = parse_cents(max_amount) if max_amount else None
+        if (min_amount and min_cents is None) or (max_amount and max_cents is None):
+            raise ValueError("Amounts must be numbers")
+        if min_cents is not None and max_cents is not None and min_cents > max_cents:
+            raise ValueError("Minimum amount is greater than maximum amount")
+        if CategoryRepository.get_by_id(category_id) is None:
+            raise ValueError("Unknown category")
+        if account_id is not None and AccountRepository.get_by_id(account_id) is None:
+            raise ValueError("Unknown account")
+        if tag_ids and not set(tag_ids) <= {t["id"] for t in TagRepository.get_all()}:
+            raise ValueError("Unknown tag")
+        return RuleRepository.create(
+            match_type, pattern, category_id, min_cents, max_cents,
+            account_id, priority, tag_ids
+        )
+
+    @staticmethod
+    def reapply(only_uncategorized: bool = True,
+                batch_size: int = REAPPLY_BATCH_SIZE) -> int:
+        """
+        Run the rules over existing transactions, by default only those
+        without a category. Transactions are read and updated batch_size at
+        a time, each batch in one transaction. Returns the number whose
+        category changed.
+        """
+        matcher = RuleService.get_matcher()
+        if not matcher.rules:
+            return 0
+        hits: Counter = Counter()
+        updated = 0
+        after_id = 0
+        while True:
+            rows = RuleRepository.get_targets(after_id, only_uncategorized, batch_size)
+            if not rows:
+                break
+            after_id = rows[-1]["id"]
+            assignments, tag_pairs = [], []
+            for r in rows:
+                rule = matcher.match(r["description"], r["amount_cents"], r["account_id"])
+                if rule is None:
+                    continue
+                hits[rule["id"]] += 1
+                assignments.append((rule["category_id"], r["id"]))
+                tag_pairs.extend((r["id"], tag_id) for tag_id in rule["tag_ids"])
+            if assignments:
+                with uow():
+                    updated += TransactionRepository.set_categories(assignments)
+                    if tag_pairs:
+                        TransactionRepository.attach_tags_many(tag_pairs)
+        RuleRepository.add_hits(hits)
+        return updated
+
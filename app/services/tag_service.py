@@ -0,0 +1,85 @@
+"""
+Tag Service - Bitmap-indexed tag queries and tag analytics
+"""
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.repositories.tag_repository import TagRepository
+from app.utils.bitmap import Bitmap
+from app.utils.cache import GenerationCache
+from app.utils.date_helpers import add_months, month_key, month_key_from_ym, month_seq
+from db import data_generation
+
+
+class TagService:
+    """Handles business logic for tag filtering and reporting."""
+
+    # Tag id -> Bitmap of transaction ids, rebuilt after any database write
+    cache = GenerationCache(max_size=4)
+
+    @staticmethod
+    def get_index() -> Dict[int, Bitmap]:
+        """Bitmap of transaction ids for every tag, built once per database generation."""
+        return TagService.cache.get_or_compute(
+            "bitmaps", data_generation(), TagService._build_index
+        )
+
+    @staticmethod
+    def _build_index() -> Dict[int, Bitmap]:
+        return {
+            t["id"]: Bitmap.from_iterable(TagRepository.get_transaction_ids(t["id"]))
+            for t in TagRepository.get_all()
+        }
+
+    @staticmethod
+    def match(all_of: Sequence[int] = (), any_of: Sequence[int] = (),
+              none_of: Sequence[int] = ()) -> Tuple[Optional[List[int]], Optional[List[int]]]:
+        """
+        Resolve a tag expression, (all of all_of) AND (any of any_of) AND
+        NOT (any of none_of), with bitmap set operations.
+
+        Returns (include_ids, exclude_ids) for TransactionRepository.build_filter:
+        include_ids is the sorted list of matching ids, or None when only
+        none_of is given, in which case exclude_ids lists the ids to leave
+        out instead of enumerating nearly every transaction.
+        """
+        index = TagService.get_index()
+        excluded = Bitmap.union(index.get(t, Bitmap()) for t in none_of)
+        if not all_of and not any_of:
+            return None, (excluded.to_list() if none_of else None)
+
+        parts = [index.get(t, Bitmap()) for t in all_of]
+        if any_of:
+            parts.append(Bitmap.union(index.get(t, Bitmap()) for t in any_of))
+        matched = Bitmap.intersection(parts)
+        if none_of:
+            matched = matched - excluded
+        return matched.to_list(), None
+
+    @staticmethod
+    def get_monthly_spend(today: date, months: int = 12) -> Dict:
+        """
+        Spending per tag for the last `months` months including this one.
+
+        Returns:
+            {"months": ['YYYY-MM', ...], "rows": [{"tag": row, "spent": [cents per month],
+            "total": cents, "count": n}, ...]} for tags with any activity, biggest first.
+        """
+        start = month_key_from_ym(*add_months(today.year, today.month, -(months - 1)))
+        month_keys = month_seq(start, month_key(today))
+        position = {m: i for i, m in enumerate(month_keys)}
+
+        spent: Dict[int, List[int]] = {}
+        counts: Dict[int, int] = {}
+        for r in TagRepository.get_monthly_spend(start):
+            if r["month"] not in position:
+                continue
+            spent.setdefault(r["tag_id"], [0] * len(month_keys))[position[r["month"]]] = r["spent_cents"]
+            counts[r["tag_id"]] = counts.get(r["tag_id"], 0) + r["txn_count"]
+
+        rows = [
+            {"tag": t, "spent": spent[t["id"]], "total": sum(spent[t["id"]]), "count": counts[t["id"]]}
+            for t in TagRepository.get_all() if t["id"] in spent
+        ]
+        rows.sort(key=lambda row: row["total"], reverse=True)
+        return {"months": month_keys, "rows": rows}
@@ -0,0 +1,104 @@
+"""
+Bitmap Utilities - Compressed integer sets with fast AND/OR/NOT
+"""
+from typing import Dict, Iterable, Iterator, List, Optional
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+CHUNK_BYTES = CHUNK_SIZE // 8
+_LOW_MASK = CHUNK_SIZE - 1
+
+# Set-bit offsets of every byte value, for decoding chunks
+_BYTE_BITS = [tuple(b for b in range(8) if value >> b & 1) for value in range(256)]
+
+
+class Bitmap:
+    """
+    Set of non-negative ints, stored roaring-style: values are split into
+    chunks of 65536 by their high bits, and each non-empty chunk is one
+    Python int used as a 65536-bit bitset. Empty chunks cost nothing, and
+    set operations run chunk by chunk as C-level big-int &, | and &~.
+    """
+
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks: Optional[Dict[int, int]] = None):
+        self.chunks = chunks or {}
+
+    @classmethod
+    def from_iterable(cls, values: Iterable[int]) -> "Bitmap":
+        """Build from any ints; runs of one chunk are packed in a bytearray."""
+        buffers: Dict[int, bytearray] = {}
+        for value in values:
+            buf = buffers.get(value >> CHUNK_BITS)
+            if buf is None:
+                buf = buffers[value >> CHUNK_BITS] = bytearray(CHUNK_BYTES)
+            low = value & _LOW_MASK
+            buf[low >> 3] |= 1 << (low & 7)
+        return cls({key: int.from_bytes(buf, "little") for key, buf in buffers.items()})
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        small, large = sorted((self.chunks, other.chunks), key=len)
+        result = {}
+        for key, bits in small.items():
+            both = bits & large.get(key, 0)
+            if both:
+                result[key] = both
+        return Bitmap(result)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        result = dict(self.chunks)
+        for key, bits in other.chunks.items():
+            result[key] = result.get(key, 0) | bits
+        return Bitmap(result)
+
+    def __sub__(self, other: "Bitmap") -> "Bitmap":
+        result = {}
+        for key, bits in self.chunks.items():
+            rest = bits & ~other.chunks.get(key, 0)
+            if rest:
+                result[key] = rest
+        return Bitmap(result)
+
+    def __len__(self) -> int:
+        return sum(bits.bit_count() for bits in self.chunks.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.chunks)
+
+    def __contains__(self, value: int) -> bool:
+        return bool(self.chunks.get(value >> CHUNK_BITS, 0) >> (value & _LOW_MASK) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        """Values in ascending order."""
+        for key in sorted(self.chunks):
+            base = key << CHUNK_BITS
+            data = self.chunks[key].to_bytes(CHUNK_BYTES, "little")
+            for offset, byte in enumerate(data):
+                if byte:
+                    start = base + (offset << 3)
+                    for bit in _BYTE_BITS[byte]:
+                        yield start + bit
+
+    def to_list(self) -> List[int]:
+        return list(self)
+
+    @staticmethod
+    def union(bitmaps: Iterable["Bitmap"]) -> "Bitmap":
+        result: Dict[int, int] = {}
+        for bitmap in bitmaps:
+            for key, bits in bitmap.chunks.items():
+                result[key] = result.get(key, 0) | bits
+        return Bitmap(result)
+
+    @staticmethod
+    def intersection(bitmaps: List["Bitmap"]) -> "Bitmap":
+        if not bitmaps:
+            return Bitmap()
+        ordered = sorted(bitmaps, key=lambda b: len(b.chunks))
+        result = ordered[0]
+        for bitmap in ordered[1:]:
+            result = result & bitmap
+            if not result:
+                break
+        return result
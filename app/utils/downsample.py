@@ -0,0 +1,70 @@
+"""
+Downsampling Utilities - Shrink long time series for charts
+"""
+from typing import Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_CHART_POINTS = 500
+MIN_POINTS = 3
+MAX_POINTS = 5000
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Indexes of the points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept. The points in between are
+    split into threshold - 2 buckets, and each bucket keeps the point that
+    forms the largest triangle with the point kept before it and the
+    average of the next bucket, which preserves peaks and troughs that an
+    every-nth-point sample would drop. Runs in O(n).
+    """
+    n = len(xs)
+    threshold = max(threshold, MIN_POINTS)
+    if n <= threshold:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket (just the last point for the final bucket)
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        ax, ay = xs[a], ys[a]
+        best_area, best = -1.0, int(i * every) + 1
+        for j in range(int(i * every) + 1, next_start):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area, best = area, j
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+def downsample(rows: List[T], max_points: int, x: Callable[[T], float],
+               y: Callable[[T], float]) -> List[T]:
+    """
+    At most max_points of rows, chosen by LTTB on (x(row), y(row)). Rows
+    carrying several series keep the same indexes for all of them, so the
+    series stay aligned; pick y as the series that matters most.
+    """
+    if len(rows) <= max_points:
+        return rows
+    indices = lttb_indices([x(r) for r in rows], [y(r) for r in rows], max_points)
+    return [rows[i] for i in indices]
+
+
+def clamp_points(value, default: int = DEFAULT_CHART_POINTS) -> int:
+    """A requested point count limited to [MIN_POINTS, MAX_POINTS]."""
+    try:
+        points = int(value)
+    except (TypeError, ValueError):
+        return default
+    return min(max(points, MIN_POINTS), MAX_POINTS)
@@ -0,0 +1,64 @@
+"""
+ETag Utilities - Conditional GETs keyed on the database write generation
+"""
+import hashlib
+import os
+from datetime import date
+
+from flask import current_app, g, request, session
+
+from db import data_generation
+
+# Changes on every restart: data_generation() counts from scratch in a new
+# process, and templates may have changed with the code
+_BOOT_TOKEN = os.urandom(8).hex()
+
+
+def no_etag(view):
+    """Mark a view whose output depends on more than the database and URL."""
+    view.no_etag = True
+    return view
+
+
+def _wants_etag() -> bool:
+    if request.method not in ("GET", "HEAD") or not current_app.config.get("ETAGS", True):
+        return False
+    view = current_app.view_functions.get(request.endpoint)
+    if view is None or getattr(view, "no_etag", False):
+        return False
+    # A pending flash message would be lost on a 304
+    return "_flashes" not in session
+
+
+def request_etag() -> str:
+    """Strong validator for this request: generation, date, path and query string."""
+    key = f"{_BOOT_TOKEN}:{data_generation()}:{date.today()}:{request.full_path}"
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def check_not_modified():
+    """
+    before_request hook: answer 304 when the browser's copy is current.
+
+    Runs before a connection is leased, so a 304 never reaches a
+    repository. The tag is kept for add_etag() to send with a full response.
+    """
+    if not _wants_etag():
+        return None
+    etag = g.etag = request_etag()
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    return None
+
+
+def add_etag(response):
+    """after_request hook: tag successful responses computed under g.etag."""
+    etag = g.pop("etag", None)
+    if etag and response.status_code == 200:
+        response.set_etag(etag)
+        # Revalidate every time: a write anywhere changes the tag
+        response.headers.setdefault("Cache-Control", "private, no-cache")
+    return response
@@ -0,0 +1,42 @@
+"""
+Fingerprint Utilities - Content hashes used to spot duplicate transactions
+"""
+import hashlib
+import re
+from typing import Callable, Optional
+
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_description(text: Optional[str]) -> str:
+    """Lowercase and collapse punctuation/whitespace: "AMZN  Mktp*US" -> "amzn mktp us"."""
+    if not text:
+        return ""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def fingerprint(account_id: int, date: str, amount_cents: int,
+                description: Optional[str], ordinal: int = 0) -> int:
+    """
+    Signed 64-bit hash of a transaction's identifying content.
+
+    ordinal tells apart genuinely identical transactions (two coffees on
+    the same day): the first copy gets 0, the next 1, and so on, so a
+    re-imported statement maps onto the same fingerprints.
+    """
+    key = f"{account_id}|{date}|{amount_cents}|{normalize_description(description)}|{ordinal}"
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def first_free_fingerprint(account_id: int, date: str, amount_cents: int,
+                           description: Optional[str],
+                           taken: Callable[[int], bool]) -> int:
+    """The fingerprint with the lowest ordinal for which taken() is False."""
+    ordinal = 0
+    while True:
+        fp = fingerprint(account_id, date, amount_cents, description, ordinal)
+        if not taken(fp):
+            return fp
+        ordinal += 1
@@ -0,0 +1,254 @@
+"""
+Profiling Utilities - Opt-in per-request SQL and template timing, slow-query log
+"""
+import logging
+import sqlite3
+import textwrap
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+from flask import before_render_template, request, template_rendered
+
+from app.utils import query_plans
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY = 200
+SERVER_TIMING_SQL_CHARS = 100
+SLOW_LOG_PARAM_CHARS = 500
+
+_local = threading.local()
+_recent = deque(maxlen=DEFAULT_HISTORY)
+# Statements at least this slow (ms) are logged with their plan; None = off
+_slow_ms = None
+
+
+class RequestProfile:
+    """Timings collected while serving one request."""
+
+    __slots__ = ("started_at", "method", "path", "status", "total_ms", "queries", "sql_ms",
+                 "slowest_ms", "slowest_sql", "render_ms", "opens", "_start", "_renders")
+
+    def __init__(self, method: str, path: str):
+        self.started_at = datetime.now()
+        self.method = method
+        self.path = path
+        self.status = None
+        self.total_ms = 0.0
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql = None
+        self.render_ms = 0.0
+        self.opens = 0
+        self._start = time.perf_counter()
+        self._renders = []
+
+    def add_query(self, sql: str, elapsed_ms: float) -> None:
+        self.queries += 1
+        self.sql_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms, self.slowest_sql = elapsed_ms, sql
+
+    def add_fetch(self, sql: str, elapsed_ms: float) -> None:
+        """Time spent stepping rows counts toward the statement that produced them."""
+        self.sql_ms += elapsed_ms
+        if sql is self.slowest_sql:
+            self.slowest_ms += elapsed_ms
+
+    def finish(self, status: int) -> None:
+        self.status = status
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (durations in ms)."""
+        metrics = [
+            f'sql;dur={self.sql_ms:.2f};desc="{self.queries} queries"',
+            f"render;dur={self.render_ms:.2f}",
+            f'db-open;desc="{self.opens} opened"',
+            f"total;dur={self.total_ms:.2f}",
+        ]
+        if self.slowest_sql:
+            sql = _header_text(self.slowest_sql)[:SERVER_TIMING_SQL_CHARS]
+            metrics.insert(1, f'sql-slowest;dur={self.slowest_ms:.2f};desc="{sql}"')
+        return ", ".join(metrics)
+
+
+def _header_text(sql: str) -> str:
+    """Single-line ASCII text safe inside a quoted header parameter."""
+    text = " ".join(sql.split()).replace("\\", "").replace('"', "'")
+    return text.encode("ascii", "replace").decode()
+
+
+def _current() -> Optional[RequestProfile]:
+    return getattr(_local, "profile", None)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """
+    Cursor that reports statement and fetch times to the request profile,
+    and logs statements slower than the slow-query threshold.
+    """
+
+    _sql = None
+    _params = ()
+    _elapsed = 0.0
+    _logged = False
+
+    def _run(self, method, sql, plan_params, *args):
+        profile = _current()
+        if profile is None and _slow_ms is None:
+            return method(*args)
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self._sql, self._params, self._elapsed, self._logged = sql, plan_params, elapsed, False
+            if profile is not None:
+                profile.add_query(sql, elapsed)
+            if _slow_ms is not None and elapsed >= _slow_ms:
+                self._log_slow()
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        # Plan with the first row's parameters when they can be read twice
+        first = None
+        if isinstance(seq_of_parameters, (list, tuple)) and seq_of_parameters:
+            first = seq_of_parameters[0]
+        return self._run(super().executemany, sql, first, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._run(super().executescript, sql_script, None, sql_script)
+
+    def _fetch(self, method, *args):
+        profile = _current()
+        if profile is None and _slow_ms is None:
+            return method(*args)
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self._elapsed += elapsed
+            if profile is not None:
+                profile.add_fetch(self._sql, elapsed)
+            if _slow_ms is not None and self._elapsed >= _slow_ms and not self._logged:
+                self._log_slow()
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, size or self.arraysize)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+    def _log_slow(self):
+        self._logged = True
+        sql = self._sql
+        plan_text, flagged = "(not available)", []
+        if self._params is not None and query_plans.is_explainable(sql):
+            try:
+                plan = query_plans.explain(self.connection, sql, self._params)
+            except sqlite3.Error as e:
+                plan_text = f"(EXPLAIN failed: {e})"
+            else:
+                plan_text = query_plans.format_plan(plan)
+                flagged = query_plans.large_scans(plan, sql)
+        params = repr(self._params)
+        if len(params) > SLOW_LOG_PARAM_CHARS:
+            params = params[:SLOW_LOG_PARAM_CHARS] + "..."
+        logger.warning(
+            "Slow query (%.1f ms)%s\n%s\nparams: %s\nplan:\n%s",
+            self._elapsed,
+            "".join(f" [SCAN of {table}]" for table, _ in flagged),
+            textwrap.dedent(sql).strip(),
+            params,
+            plan_text,
+        )
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose statements run on ProfiledCursors; counts opens per request."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        profile = _current()
+        if profile is not None:
+            profile.opens += 1
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def _start_request():
+    if request.endpoint != "static":
+        _local.profile = RequestProfile(request.method, request.full_path.rstrip("?"))
+
+
+def _finish_request(response):
+    profile = _local.__dict__.pop("profile", None)
+    if profile is not None:
+        profile.finish(response.status_code)
+        response.headers["Server-Timing"] = profile.server_timing()
+        _recent.append(profile)
+    return response
+
+
+def _template_started(sender, template, context, **extra):
+    profile = _current()
+    if profile is not None:
+        profile._renders.append(time.perf_counter())
+
+
+def _template_done(sender, template, context, **extra):
+    profile = _current()
+    if profile is not None and profile._renders:
+        started = profile._renders.pop()
+        # Only the outermost render counts; nested ones are part of it
+        if not profile._renders:
+            profile.render_ms += (time.perf_counter() - started) * 1000
+
+
+def init_app(app) -> None:
+    """
+    Profile every request of app. Its connection pool must be configured
+    with factory=ProfiledConnection for SQL to be timed.
+    """
+    global _recent
+    _recent = deque(maxlen=app.config.get("PROFILING_HISTORY", DEFAULT_HISTORY))
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_done, app)
+
+
+def set_slow_query_threshold(threshold_ms: Optional[float]) -> None:
+    """
+    Log statements run on ProfiledConnections that take at least
+    threshold_ms (execute plus fetches), with parameters and query plan.
+    None turns the log off.
+    """
+    global _slow_ms
+    _slow_ms = threshold_ms
+
+
+def recent_requests() -> List[RequestProfile]:
+    """Profiles of the most recent requests, newest first."""
+    return list(reversed(_recent))
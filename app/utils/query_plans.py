@@ -0,0 +1,94 @@
+"""
+Query Plan Utilities - EXPLAIN QUERY PLAN capture and full-scan detection
+"""
+import re
+import sqlite3
+from typing import Dict, List, Sequence, Tuple
+
+# Tables that grow with the user's history; a full SCAN of one is a regression
+LARGE_TABLES = ("transactions", "transaction_tags", "budgets", "account_balances")
+
+PlanRow = Tuple[int, int, str]
+
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE|INTO)\s+([A-Za-z_]\w*)(?:\s+(?:AS\s+)?([A-Za-z_]\w*))?",
+    re.IGNORECASE,
+)
+_NOT_ALIASES = {
+    "as", "on", "where", "join", "left", "right", "inner", "outer", "cross", "natural",
+    "group", "order", "limit", "using", "indexed", "not", "union", "except", "intersect",
+    "set", "values", "default", "select", "window", "having", "returning", "full",
+}
+_SCAN = re.compile(r"^SCAN (\w+)")
+_SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)")
+
+
+def is_explainable(sql: str) -> bool:
+    """Whether sql is a single statement EXPLAIN QUERY PLAN can describe."""
+    return sql.lstrip().upper().startswith(_EXPLAINABLE)
+
+
+def explain(conn: sqlite3.Connection, sql: str, params=()) -> List[PlanRow]:
+    """(id, parent, detail) rows of the statement's query plan."""
+    cursor = conn.cursor(sqlite3.Cursor)
+    try:
+        return [tuple(r[:2]) + (r[3],) for r in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    finally:
+        cursor.close()
+
+
+def format_plan(plan: Sequence[PlanRow]) -> str:
+    """Plan rows as an indented tree, like the sqlite3 shell prints them."""
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for node, parent, detail in plan:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return "\n".join(lines)
+
+
+def table_aliases(sql: str) -> Dict[str, str]:
+    """Name or alias -> table for every table referenced in sql (lowercase)."""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        table = table.lower()
+        aliases.setdefault(table, table)
+        if alias and alias.lower() not in _NOT_ALIASES:
+            aliases[alias.lower()] = table
+    return aliases
+
+
+def large_scans(plan: Sequence[PlanRow], sql: str,
+                tables: Sequence[str] = LARGE_TABLES) -> List[Tuple[str, str]]:
+    """(table, plan detail) for every step that scans one of tables end to end."""
+    aliases = table_aliases(sql)
+    parents = {node: parent for node, parent, _ in plan}
+    # Subqueries and CTEs; scanning their output is not a table scan, even
+    # when they reuse a table alias (FROM (SELECT ... FROM transactions t) t)
+    subqueries = {}
+    for node, _, detail in plan:
+        match = _SUBQUERY.match(detail)
+        if match:
+            subqueries[match.group(1).lower()] = node
+
+    found = []
+    for node, _, detail in plan:
+        match = _SCAN.match(detail)
+        if not match:
+            continue
+        name = match.group(1).lower()
+        if name in subqueries and not _descends_from(node, subqueries[name], parents):
+            continue
+        table = aliases.get(name, name)
+        if table in tables:
+            found.append((table, detail))
+    return found
+
+
+def _descends_from(node: int, ancestor: int, parents: Dict[int, int]) -> bool:
+    while node in parents:
+        node = parents[node]
+        if node == ancestor:
+            return True
+    return False
@@ -0,0 +1,120 @@
+"""
+Rule Matcher - Compiled matching of descriptions against categorization rules
+"""
+import re
+from typing import Dict, List, Optional, Sequence
+
+
+MATCH_TYPES = ("contains", "prefix", "regex")
+MEMO_LIMIT = 50_000
+
+
+def _trie_pattern(literals: Sequence[str]) -> str:
+    """
+    One regex alternation for many literals, factored by shared prefixes
+    (["amazon", "amex"] -> "am(?:azon|ex)"), so the regex engine walks a
+    trie instead of trying each literal in turn. It matches the longest
+    literal starting at a given position.
+    """
+    trie: Dict = {}
+    for literal in literals:
+        node = trie
+        for ch in literal:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class RuleMatcher:
+    """
+    All active rules compiled into a few regexes.
+
+    Rules are dicts with id, match_type, pattern, min_cents, max_cents,
+    account_id, category_id and tag_ids, ordered by priority; the first
+    rule whose pattern, amount range and account all fit wins.
+
+    Contains and prefix literals each become one trie-shaped regex, and a
+    hit on literal L also counts for every other literal inside L. Regex
+    rules are tried one by one. Pattern matches depend only on the
+    description, so they are memoized; amount and account are checked per
+    row.
+    """
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        contains: Dict[str, List[int]] = {}
+        prefixes: Dict[str, List[int]] = {}
+        self.regexes = []
+        self.unconditional = []
+        for index, rule in enumerate(rules):
+            pattern = rule["pattern"] or ""
+            if rule["match_type"] == "regex" and pattern:
+                self.regexes.append((index, re.compile(pattern, re.IGNORECASE)))
+            elif pattern.strip():
+                target = prefixes if rule["match_type"] == "prefix" else contains
+                target.setdefault(pattern.strip().lower(), []).append(index)
+            else:
+                self.unconditional.append(index)
+
+        # Literal -> every rule whose literal occurs inside it
+        self._contains_hits = {
+            lit: sorted(i for other, ids in contains.items() if other in lit for i in ids)
+            for lit in contains
+        }
+        self._prefix_hits = {
+            lit: sorted(i for other, ids in prefixes.items() if lit.startswith(other) for i in ids)
+            for lit in prefixes
+        }
+        # The lookahead finds the longest literal at every start position,
+        # so overlapping occurrences are not skipped
+        self._contains_re = (
+            re.compile(f"(?=({_trie_pattern(list(contains))}))") if contains else None
+        )
+        self._prefix_re = re.compile(_trie_pattern(list(prefixes))) if prefixes else None
+        self._memo: Dict[str, tuple] = {}
+
+    def candidates(self, description: Optional[str]) -> tuple:
+        """Indexes of rules whose pattern matches, in priority order."""
+        description = description or ""
+        cached = self._memo.get(description)
+        if cached is not None:
+            return cached
+        text = description.lower()
+        found = set(self.unconditional)
+        if self._contains_re is not None:
+            for literal in set(self._contains_re.findall(text)):
+                found.update(self._contains_hits[literal])
+        if self._prefix_re is not None:
+            m = self._prefix_re.match(text)
+            if m:
+                found.update(self._prefix_hits[m.group()])
+        for index, regex in self.regexes:
+            if regex.search(description):
+                found.add(index)
+        result = tuple(sorted(found))
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[description] = result
+        return result
+
+    def match(self, description: Optional[str], amount_cents: int,
+              account_id: Optional[int]) -> Optional[Dict]:
+        """The highest-priority rule that fits this transaction, or None."""
+        for index in self.candidates(description):
+            rule = self.rules[index]
+            if rule["min_cents"] is not None and amount_cents < rule["min_cents"]:
+                continue
+            if rule["max_cents"] is not None and amount_cents > rule["max_cents"]:
+                continue
+            if rule["account_id"] is not None and account_id != rule["account_id"]:
+                continue
+            return rule
+        return None
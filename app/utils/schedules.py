@@ -0,0 +1,48 @@
+"""
+Schedule Utilities - Expand recurring schedules into occurrence dates
+"""
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Iterator, Optional
+
+from app.utils.date_helpers import add_months
+
+
+STEP_DAYS = {"weekly": 7, "biweekly": 14}
+
+
+def occurrences(frequency: str, day_of_month: int, anchor: Optional[date],
+                after: date, through: date) -> Iterator[date]:
+    """
+    Yield occurrence dates in the half-open window (after, through].
+
+    Args:
+        frequency: "weekly", "biweekly", "monthly" or "month_end"
+        day_of_month: Day for monthly rules, clamped to the month's length
+        anchor: First occurrence for weekly/biweekly rules; for monthly
+            rules, nothing before it is yielded
+        after: Exclusive lower bound (the rule's watermark)
+        through: Inclusive upper bound (usually today)
+    """
+    if through <= after:
+        return
+
+    if frequency in STEP_DAYS:
+        step = STEP_DAYS[frequency]
+        anchor = anchor or after + timedelta(days=1)
+        # Jump straight to the first occurrence after the watermark
+        skipped = max(0, -(-((after - anchor).days + 1) // step))
+        current = anchor + timedelta(days=skipped * step)
+        while current <= through:
+            yield current
+            current += timedelta(days=step)
+        return
+
+    year, month = after.year, after.month
+    while (year, month) <= (through.year, through.month):
+        days_in_month = monthrange(year, month)[1]
+        day = days_in_month if frequency == "month_end" else min(day_of_month, days_in_month)
+        current = date(year, month, day)
+        if after < current <= through and (anchor is None or current >= anchor):
+            yield current
+        year, month = add_months(year, month, 1)
@@ -2,6 +2,8 @@
 Validation Utilities
 """
 import re
+from decimal import Decimal
+from typing import Optional
 
 
 HEX_COLOR_REGEX = re.compile(r"^#[0-9a-fA-F]{6}$")
@@ -9,6 +11,10 @@ HEX_COLOR_REGEX = re.compile(r"^#[0-9a-fA-F]{6}$")
 VALID_ACCOUNT_TYPES = ("debit", "credit", "investment")
 VALID_DIRECTIONS = ("in", "out")
 VALID_GROUP_TYPES = ("expense", "income")
+VALID_FREQUENCIES = ("weekly", "biweekly", "monthly", "month_end")
+
+# $10 trillion; leaves SQLite's 64-bit integers room to sum many of them
+MAX_CENTS = 10 ** 15
 
 
 def validate_account_type(account_type: str) -> bool:
@@ -21,6 +27,11 @@ def validate_direction(direction: str) -> bool:
     return direction in VALID_DIRECTIONS
 
 
+def validate_frequency(frequency: str) -> bool:
+    """Validate recurring schedule frequency is valid."""
+    return frequency in VALID_FREQUENCIES
+
+
 def validate_group_type(group_type: str) -> bool:
     """Validate category group type is valid."""
     return group_type in VALID_GROUP_TYPES
@@ -55,3 +66,27 @@ def dollars_to_cents(dollars: float) -> int:
 def cents_to_dollars(cents: int) -> float:
     """Convert cents to dollar amount."""
     return cents / 100
+
+
+def parse_cents(value: str) -> Optional[int]:
+    """
+    Parse a money string such as "-1,234.56", "$12.00" or "(12.00)" into
+    integer cents without going through float. Returns None if unparseable,
+    not finite, or too large to store.
+    """
+    if value is None:
+        return None
+    text = value.strip().replace(",", "").replace("$", "")
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    try:
+        amount = Decimal(text)
+        if not amount.is_finite():
+            return None
+        cents = int((amount * 100).to_integral_value())
+    except ArithmeticError:  # decimal.InvalidOperation, decimal.Overflow
+        return None
+    if abs(cents) > MAX_CENTS:
+        return None
+    return -cents if negative else cents
@@ -1,16 +1,242 @@
 import os
+import queue
 import sqlite3
+import threading
 from contextlib import contextmanager
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "budgeteer.db")
 
+# Applied to every connection when it is opened. Override via configure().
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -20000,        # negative = KiB, so ~20 MB of page cache
+    "mmap_size": 268435456,      # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_POOL_TIMEOUT = 30.0
+DEFAULT_CACHED_STATEMENTS = 256
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections with PRAGMAs applied on open."""
+
+    def __init__(self, path: str, pragmas: dict = None, max_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_POOL_TIMEOUT,
+                 cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+                 factory: type = sqlite3.Connection):
+        self.path = path
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.max_size = max_size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._stats = {"opens": 0, "reuses": 0, "waits": 0}
+        self._monitor = None
+        self._monitor_lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            factory=self.factory,
+        )
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}").fetchall()
+        return conn
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, open a new one, or wait for one to be released."""
+        try:
+            conn = self._idle.get_nowait()
+            self._count("reuses")
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._created < self.max_size
+            if can_open:
+                self._created += 1
+                self._stats["opens"] += 1
+        if can_open:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        self._count("waits")
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"timed out waiting for a database connection (pool size {self.max_size})"
+            )
+        self._count("reuses")
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool, discarding any uncommitted work."""
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def data_version(self) -> int:
+        """
+        PRAGMA data_version seen by a dedicated connection that never writes.
+
+        It changes whenever any other connection, in this process or another,
+        commits, so it works as a database-wide write generation.
+        """
+        with self._monitor_lock:
+            if self._monitor is None:
+                self._monitor = sqlite3.connect(self.path, check_same_thread=False)
+            return self._monitor.execute("PRAGMA data_version").fetchall()[0][0]
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+        with self._monitor_lock:
+            if self._monitor is not None:
+                self._monitor.close()
+                self._monitor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, size=self._created, idle=self._idle.qsize())
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def configure(path: str = None, pragmas: dict = None, pool_size: int = None,
+              factory: type = None) -> None:
+    """
+    (Re)create the connection pool. Unset arguments keep their defaults.
+    factory is a sqlite3.Connection subclass to open connections with.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(
+            path or DB_PATH,
+            pragmas=pragmas,
+            max_size=pool_size or DEFAULT_POOL_SIZE,
+            factory=factory or sqlite3.Connection,
+        )
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def pool_stats() -> dict:
+    """Counters for connection opens, reuses and waits since the pool was created."""
+    return get_pool().stats()
+
+
+def data_generation() -> int:
+    """Token that changes after every committed write to the database."""
+    return get_pool().data_version()
+
+
+def bind_connection() -> None:
+    """Lease one connection to the current thread (e.g. for a Flask request)."""
+    if getattr(_local, "conn", None) is None:
+        _local.conn = get_pool().acquire()
+
+
+def release_connection(exc=None) -> None:
+    """Return the connection leased by bind_connection() to the pool."""
+    conn = _local.__dict__.pop("conn", None)
+    if conn is not None:
+        get_pool().release(conn)
+
+
 @contextmanager
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = getattr(_local, "conn", None)
+    owned = conn is None
+    if owned:
+        conn = get_pool().acquire()
+        _local.conn = conn
+    # Inside uow() the outermost unit of work decides when to commit
+    in_uow = getattr(_local, "uow_depth", 0) > 0
+    try:
+        yield conn
+        if not in_uow:
+            conn.commit()
+    except BaseException:
+        if not in_uow:
+            conn.rollback()
+        raise
+    finally:
+        if owned:
+            _local.__dict__.pop("conn", None)
+            get_pool().release(conn)
+
+
+@contextmanager
+def uow():
+    """
+    Unit of work: every get_db() block inside runs in one BEGIN...COMMIT.
+
+    The outermost unit begins IMMEDIATE, taking the write lock up front: a
+    deferred transaction that reads and then writes fails at once with
+    SQLITE_BUSY (busy_timeout does not retry the upgrade) if another
+    connection committed in between. Nested units join the outermost one.
+    Any exception rolls the whole unit back.
+    """
+    conn = getattr(_local, "conn", None)
+    owned = conn is None
+    if owned:
+        conn = get_pool().acquire()
+        _local.conn = conn
+    depth = getattr(_local, "uow_depth", 0)
+    _local.uow_depth = depth + 1
     try:
+        if depth == 0 and not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
         yield conn
-        conn.commit()
+        if depth == 0:
+            conn.commit()
+    except BaseException:
+        if depth == 0:
+            conn.rollback()
+        raise
     finally:
-        conn.close()
+        _local.uow_depth = depth
+        if owned:
+            _local.__dict__.pop("conn", None)
+            get_pool().release(conn)
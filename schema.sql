@@ -55,9 +55,13 @@ CREATE TABLE IF NOT EXISTS recurring (
   account_id INTEGER NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
   category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
   amount_cents INTEGER NOT NULL,
-  day_of_month INTEGER NOT NULL CHECK (day_of_month BETWEEN 1 AND 28),
+  day_of_month INTEGER NOT NULL CHECK (day_of_month BETWEEN 1 AND 31),  -- clamped to month length
   direction TEXT NOT NULL DEFAULT 'out' CHECK (direction IN ('in','out')),
-  active INTEGER NOT NULL DEFAULT 1
+  active INTEGER NOT NULL DEFAULT 1,
+  posted_through TEXT,          -- 'YYYY-MM-DD' watermark; occurrences up to here are posted
+  frequency TEXT NOT NULL DEFAULT 'monthly'
+    CHECK (frequency IN ('weekly','biweekly','monthly','month_end')),
+  start_date TEXT               -- 'YYYY-MM-DD'; first occurrence anchor for weekly/biweekly
 );
 
 -- Tags
@@ -76,7 +80,9 @@ CREATE TABLE IF NOT EXISTS transactions (
   amount_cents INTEGER NOT NULL,
   category_id INTEGER REFERENCES categories(id) ON DELETE SET NULL,
   recurring_id INTEGER REFERENCES recurring(id) ON DELETE SET NULL,
-  created_at TEXT DEFAULT CURRENT_TIMESTAMP
+  created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+  month TEXT GENERATED ALWAYS AS (substr(date, 1, 7)) VIRTUAL,  -- 'YYYY-MM'
+  fingerprint INTEGER           -- content hash for duplicate detection, see app/utils/fingerprint.py
 );
 
 CREATE TABLE IF NOT EXISTS transaction_tags (
@@ -85,8 +91,239 @@ CREATE TABLE IF NOT EXISTS transaction_tags (
   PRIMARY KEY (transaction_id, tag_id)
 );
 
+-- Auto-categorization rules, tried in priority order (lowest first). The
+-- first rule whose pattern, amount range and account all fit assigns its
+-- category and tags. See app/utils/rule_matcher.py.
+CREATE TABLE IF NOT EXISTS category_rules (
+  id INTEGER PRIMARY KEY,
+  match_type TEXT NOT NULL DEFAULT 'contains'
+    CHECK (match_type IN ('contains','prefix','regex')),
+  pattern TEXT NOT NULL DEFAULT '',   -- '' matches any description
+  min_cents INTEGER,                  -- inclusive amount_cents bounds; NULL = open
+  max_cents INTEGER,
+  account_id INTEGER REFERENCES accounts(id) ON DELETE CASCADE,
+  category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+  priority INTEGER NOT NULL DEFAULT 100,
+  hit_count INTEGER NOT NULL DEFAULT 0,
+  created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS category_rule_tags (
+  rule_id INTEGER NOT NULL REFERENCES category_rules(id) ON DELETE CASCADE,
+  tag_id INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
+  PRIMARY KEY (rule_id, tag_id)
+);
+
+-- Single-row token that changes whenever a rule or its tags change
+-- (including FK cascades), keying the compiled matcher cache in
+-- app/services/rule_service.py. It is random rather than a counter so a
+-- rolled-back change's value is never reused. hit_count updates don't count.
+CREATE TABLE IF NOT EXISTS category_rules_version (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  token INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO category_rules_version(id, token) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_rules_version_insert
+AFTER INSERT ON category_rules
+BEGIN
+  UPDATE category_rules_version SET token = random();
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rules_version_update
+AFTER UPDATE OF match_type, pattern, min_cents, max_cents, account_id, category_id, priority
+ON category_rules
+BEGIN
+  UPDATE category_rules_version SET token = random();
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rules_version_delete
+AFTER DELETE ON category_rules
+BEGIN
+  UPDATE category_rules_version SET token = random();
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rule_tags_version_insert
+AFTER INSERT ON category_rule_tags
+BEGIN
+  UPDATE category_rules_version SET token = random();
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rule_tags_version_delete
+AFTER DELETE ON category_rule_tags
+BEGIN
+  UPDATE category_rules_version SET token = random();
+END;
+
+-- Ids staged by a bulk edit (app/services/bulk_edit_service.py). While it
+-- has rows, inside the bulk edit's transaction, the per-row rollup and
+-- search-index triggers stand down and the edit refreshes both once.
+CREATE TABLE IF NOT EXISTS bulk_edit_ids (
+  id INTEGER PRIMARY KEY
+);
+
+-- Monthly per-category rollup of transactions, kept exact by the triggers
+-- below. category_id 0 holds uncategorized transactions.
+CREATE TABLE IF NOT EXISTS monthly_category_totals (
+  month TEXT NOT NULL,          -- 'YYYY-MM'
+  category_id INTEGER NOT NULL DEFAULT 0,
+  income_cents INTEGER NOT NULL DEFAULT 0,
+  spent_cents INTEGER NOT NULL DEFAULT 0,   -- positive magnitude of expenses
+  txn_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (month, category_id)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_txn_totals_insert
+AFTER INSERT ON transactions
+BEGIN
+  INSERT INTO monthly_category_totals(month, category_id, income_cents, spent_cents, txn_count)
+  VALUES (
+    substr(NEW.date, 1, 7),
+    COALESCE(NEW.category_id, 0),
+    CASE WHEN NEW.amount_cents > 0 THEN NEW.amount_cents ELSE 0 END,
+    CASE WHEN NEW.amount_cents < 0 THEN -NEW.amount_cents ELSE 0 END,
+    1
+  )
+  ON CONFLICT(month, category_id) DO UPDATE SET
+    income_cents = income_cents + excluded.income_cents,
+    spent_cents = spent_cents + excluded.spent_cents,
+    txn_count = txn_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_txn_totals_delete
+AFTER DELETE ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM bulk_edit_ids)
+BEGIN
+  UPDATE monthly_category_totals SET
+    income_cents = income_cents - CASE WHEN OLD.amount_cents > 0 THEN OLD.amount_cents ELSE 0 END,
+    spent_cents = spent_cents - CASE WHEN OLD.amount_cents < 0 THEN -OLD.amount_cents ELSE 0 END,
+    txn_count = txn_count - 1
+  WHERE month = substr(OLD.date, 1, 7) AND category_id = COALESCE(OLD.category_id, 0);
+  DELETE FROM monthly_category_totals
+  WHERE month = substr(OLD.date, 1, 7) AND category_id = COALESCE(OLD.category_id, 0)
+    AND txn_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_txn_totals_update
+AFTER UPDATE OF date, amount_cents, category_id ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM bulk_edit_ids)
+BEGIN
+  UPDATE monthly_category_totals SET
+    income_cents = income_cents - CASE WHEN OLD.amount_cents > 0 THEN OLD.amount_cents ELSE 0 END,
+    spent_cents = spent_cents - CASE WHEN OLD.amount_cents < 0 THEN -OLD.amount_cents ELSE 0 END,
+    txn_count = txn_count - 1
+  WHERE month = substr(OLD.date, 1, 7) AND category_id = COALESCE(OLD.category_id, 0);
+  DELETE FROM monthly_category_totals
+  WHERE month = substr(OLD.date, 1, 7) AND category_id = COALESCE(OLD.category_id, 0)
+    AND txn_count <= 0;
+  INSERT INTO monthly_category_totals(month, category_id, income_cents, spent_cents, txn_count)
+  VALUES (
+    substr(NEW.date, 1, 7),
+    COALESCE(NEW.category_id, 0),
+    CASE WHEN NEW.amount_cents > 0 THEN NEW.amount_cents ELSE 0 END,
+    CASE WHEN NEW.amount_cents < 0 THEN -NEW.amount_cents ELSE 0 END,
+    1
+  )
+  ON CONFLICT(month, category_id) DO UPDATE SET
+    income_cents = income_cents + excluded.income_cents,
+    spent_cents = spent_cents + excluded.spent_cents,
+    txn_count = txn_count + 1;
+END;
+
+-- Full-text index over transaction descriptions plus category and tag
+-- names, kept in sync by the triggers below. The rowid is the search key
+-- (days since 1970-01-01 << 32) | transactions.id, so rowid order is
+-- (date, id) order and newest-first search pages are a rowid range scan.
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+  description, category, tags,
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3 4 5 6'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_txn_fts_insert
+AFTER INSERT ON transactions
+BEGIN
+  INSERT INTO transactions_fts(rowid, description, category, tags)
+  VALUES (((CAST(julianday(NEW.date) - 2440587.5 AS INTEGER) << 32) | NEW.id), NEW.description,
+          (SELECT name FROM categories WHERE id = NEW.category_id), '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_txn_fts_delete
+AFTER DELETE ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM bulk_edit_ids)
+BEGIN
+  DELETE FROM transactions_fts WHERE rowid = ((CAST(julianday(OLD.date) - 2440587.5 AS INTEGER) << 32) | OLD.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_txn_fts_update
+AFTER UPDATE OF date, description, category_id ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM bulk_edit_ids)
+BEGIN
+  DELETE FROM transactions_fts WHERE rowid = ((CAST(julianday(OLD.date) - 2440587.5 AS INTEGER) << 32) | OLD.id);
+  INSERT INTO transactions_fts(rowid, description, category, tags)
+  VALUES (
+    ((CAST(julianday(NEW.date) - 2440587.5 AS INTEGER) << 32) | NEW.id), NEW.description,
+    (SELECT name FROM categories WHERE id = NEW.category_id),
+    COALESCE((SELECT GROUP_CONCAT(tags.name, ' ') FROM transaction_tags tt
+              JOIN tags ON tags.id = tt.tag_id WHERE tt.transaction_id = NEW.id), '')
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_txn_tags_fts_insert
+AFTER INSERT ON transaction_tags
+WHEN NOT EXISTS (SELECT 1 FROM bulk_edit_ids)
+BEGIN
+  UPDATE transactions_fts SET tags = (
+    SELECT GROUP_CONCAT(tags.name, ' ') FROM transaction_tags tt
+    JOIN tags ON tags.id = tt.tag_id WHERE tt.transaction_id = NEW.transaction_id
+  ) WHERE rowid = (SELECT (CAST(julianday(date) - 2440587.5 AS INTEGER) << 32) | id
+                   FROM transactions WHERE id = NEW.transaction_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_txn_tags_fts_delete
+AFTER DELETE ON transaction_tags
+WHEN NOT EXISTS (SELECT 1 FROM bulk_edit_ids)
+BEGIN
+  UPDATE transactions_fts SET tags = COALESCE((
+    SELECT GROUP_CONCAT(tags.name, ' ') FROM transaction_tags tt
+    JOIN tags ON tags.id = tt.tag_id WHERE tt.transaction_id = OLD.transaction_id
+  ), '') WHERE rowid = (SELECT (CAST(julianday(date) - 2440587.5 AS INTEGER) << 32) | id
+                       FROM transactions WHERE id = OLD.transaction_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_category_fts_rename
+AFTER UPDATE OF name ON categories
+BEGIN
+  UPDATE transactions_fts SET category = NEW.name
+  WHERE rowid IN (SELECT (CAST(julianday(date) - 2440587.5 AS INTEGER) << 32) | id
+                  FROM transactions WHERE category_id = NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_tag_fts_rename
+AFTER UPDATE OF name ON tags
+BEGIN
+  UPDATE transactions_fts SET tags = (
+    SELECT GROUP_CONCAT(tags.name, ' ') FROM transaction_tags tt
+    JOIN tags ON tags.id = tt.tag_id
+    WHERE tt.transaction_id = (transactions_fts.rowid & 4294967295)
+  ) WHERE rowid IN (
+    SELECT (CAST(julianday(t.date) - 2440587.5 AS INTEGER) << 32) | t.id
+    FROM transaction_tags tt
+    JOIN transactions t ON t.id = tt.transaction_id
+    WHERE tt.tag_id = NEW.id
+  );
+END;
+
 -- Indexes for dashboard and filtering performance
 CREATE INDEX IF NOT EXISTS idx_txn_date ON transactions(date);
 CREATE INDEX IF NOT EXISTS idx_txn_cat ON transactions(category_id);
+-- Covers the per-account balance scans behind net worth history
+CREATE INDEX IF NOT EXISTS idx_balances_account_asof ON account_balances(account_id, as_of, balance_cents);
+-- Transactions by tag; the primary key already gives tags by transaction
+CREATE INDEX IF NOT EXISTS idx_txn_tags_tag ON transaction_tags(tag_id, transaction_id);
 
 CREATE UNIQUE INDEX IF NOT EXISTS idx_budget_unique ON budgets(month, category_id);
+-- Budgets by category, for merges and the ON DELETE CASCADE from categories
+CREATE INDEX IF NOT EXISTS idx_budget_category ON budgets(category_id);
+
+-- Indexes on columns added after the initial release live in app/migrations.py